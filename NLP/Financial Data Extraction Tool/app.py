@@ -1,12 +1,40 @@
 import streamlit as st
 import pandas as pd
+import time
 import helper
+import normalize
+
+
+@st.cache_data(show_spinner="Extracting...", max_entries=256)
+def cached_extraction(article_text, _misses=None):
+    # Keyed on the article text: clicking Extract again on the same article,
+    # or any other rerun, reuses the result instead of calling the LLM.
+    # _misses is not hashed (leading underscore); this body only runs on a
+    # miss, so the caller learns whether its own call hit the cache.
+    if _misses is not None:
+        _misses.append(article_text)
+    return helper.extract_financial_info(article_text)
+
+
+def measure_table(df):
+    """Show a one-row wide extraction as a Measure/Value table."""
+    values = df.iloc[0].astype("string").fillna("") if len(df) else [""] * len(df.columns)
+    return pd.DataFrame({"Measure": df.columns, "Value": list(values)})
+
+
+def record_extraction(article_text, df, seconds, cached):
+    """Add an extraction to the session history, moving repeats to the top."""
+    history = st.session_state.setdefault("history", [])
+    history[:] = [entry for entry in history if entry["text"] != article_text]
+    st.session_state["extractions"] = st.session_state.get("extractions", 0) + 1
+    company = df["company_name"].iloc[0]
+    company = company if pd.notna(company) else "Article"
+    label = f"#{st.session_state['extractions']} {company} ({time.strftime('%H:%M:%S')})"
+    history.insert(0, {"label": label, "text": article_text, "df": df, "seconds": seconds, "cached": cached})
+
 
 st.title("Financial Data Extraction Tool")
-financial_data_df = pd.DataFrame({
-    "Measure": ["Company Name", "Stock Symbol", "Revenue", "Net Income", "Total Assets", "EBITDA", "Stock Price", "EPS"],
-    "Value": ["", "", "", "", "", "", "", ""]
-})
+financial_data_df = st.session_state.get("current", normalize.build_wide_frame([]))
 
 col1, col2 = st.columns([3, 2])
 
@@ -14,16 +42,79 @@ with col1:
     st.header("Extractor Tool")
     article_text = st.text_area("Enter financial text(article) here:", height=350)
     if st.button("Extract"):
-        financial_data_df = helper.extract_financial_info(article_text)
+        misses = []
+        start_time = time.perf_counter()
+        financial_data_df = cached_extraction(article_text.strip(), _misses=misses)
+        elapsed = time.perf_counter() - start_time
+        cached = not misses
+        st.session_state["current"] = financial_data_df
+        record_extraction(article_text.strip(), financial_data_df, elapsed, cached)
+        st.caption(f"{'Served from cache' if cached else 'Extracted'} in {elapsed * 1000:.0f}ms. "
+                   + helper.extraction_summary())
 
 with col2:
     # st.header("Resultant Dataframe")
     st.markdown("<br>" * 3, unsafe_allow_html=True)
     st.dataframe(
-        financial_data_df,
+        measure_table(financial_data_df),
         column_config = {
             "Measure": st.column_config.Column(width=150),
             "Value": st.column_config.Column(width=150)
         },
         hide_index=True
-    )
\ No newline at end of file
+    )
+
+history = st.session_state.get("history", [])
+if history:
+    st.header("Extraction History")
+    labels = [entry["label"] for entry in history]
+    selected = st.multiselect("Compare extractions side by side:", labels, default=labels[:2])
+    if selected:
+        entries = {entry["label"]: entry for entry in history}
+        comparison = pd.DataFrame({"Measure": normalize.build_wide_frame([]).columns})
+        for label in selected:
+            comparison[label] = measure_table(entries[label]["df"])["Value"].values
+        comparison = comparison[comparison["Measure"] != "article_id"]
+        comparison["Differs"] = comparison[selected].nunique(axis=1) > 1
+        st.dataframe(comparison, hide_index=True)
+    timings = [f"{entry['label']}: " + ("cache" if entry["cached"] else f"{entry['seconds']:.1f}s") for entry in history]
+    history_col, clear_col = st.columns([4, 1])
+    history_col.caption(" · ".join(timings))
+    if clear_col.button("Clear history"):
+        st.session_state.pop("history", None)
+        st.session_state.pop("current", None)
+        st.rerun()
+
+st.header("Batch Extraction")
+uploaded_file = st.file_uploader(
+    "Upload a CSV (one article per row, with a \"text\" column and optional \"id\" column) or a ZIP of .txt articles",
+    type=["csv", "zip"],
+)
+if uploaded_file is not None and st.button("Extract All"):
+    if uploaded_file.name.lower().endswith(".zip"):
+        articles = helper.load_articles_from_zip(uploaded_file)
+    else:
+        articles = helper.load_articles_from_csv(uploaded_file)
+
+    progress_bar = st.progress(0.0, text=f"0 / {len(articles)} articles")
+    start_time = time.perf_counter()
+
+    def show_progress(done, total):
+        elapsed = time.perf_counter() - start_time
+        progress_bar.progress(done / total, text=f"{done} / {total} articles ({done / elapsed * 60:.0f} articles/min)")
+
+    try:
+        batch_df = helper.extract_financial_info_batch(articles, progress=show_progress, wide=True)
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
+    elapsed = time.perf_counter() - start_time
+    st.success(f"Extracted {len(articles)} articles in {elapsed:.1f}s ({len(articles) / elapsed * 60:.0f} articles/min)")
+    st.caption(helper.extraction_summary())
+    failed = int(batch_df["error"].notna().sum())
+    if failed:
+        st.warning(f"{failed} article(s) could not be extracted; see the error column.")
+    st.dataframe(batch_df, hide_index=True)
+    st.download_button("Download CSV", batch_df.to_csv(index=False), file_name="financial_data.csv", mime="text/csv")
+    st.download_button("Download Parquet", batch_df.to_parquet(index=False), file_name="financial_data.parquet",
+                       mime="application/octet-stream")
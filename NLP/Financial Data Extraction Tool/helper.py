@@ -1,18 +1,41 @@
-from openai import OpenAI
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import csv
+import io
 import json
+import logging
 import pandas as pd
 import os
+import sys
+import threading
+import time
+import zipfile
+import normalize
+import rules
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from llm_common.clients import get_client
+from llm_common.prompts import PromptTemplate, format_prompt_stats
+from llm_common.ratelimit import RateLimiter
 
 load_dotenv()
+logger = logging.getLogger(__name__)
+
+FIELDS = ["Company Name", "Stock Symbol", "Revenue", "Net Income", "Total Assets", "EBITDA", "Stock Price", "Earnings per Share (EPS)"]
+EXAMPLE_VALUES = {"Company Name": "Walmart Inc.", "Stock Symbol": "WMT", "Revenue": "$559.2 billion", "Net Income": "$13.7 billion",
+                  "Total Assets": "$252.5 billion", "EBITDA": "$22.5 billion", "Stock Price": "$177.57", "Earnings per Share (EPS)": "$5.61"}
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Running totals of how much work the local rules saved.
+EXTRACTION_STATS = {"articles": 0, "fields": 0, "local_fields": 0, "llm_calls": 0, "llm_calls_skipped": 0,
+                    "llm_cache_hits": 0, "llm_seconds": 0.0}
+_stats_lock = threading.Lock()
 
-def get_prompt():
-    return '''Please retrieve Company Name, Stock Symbol, Revenue, Net Income, Total Assets, EBITDA, Stock Price, earnings per share (EPS) from the given financial text or the news article. If you can't find the information from the text or the news article then return "Not Found". DO NOT MAKE UP ANY INFORMATION.
+# Templates are parsed once; the instructions come first and stay
+# byte-identical between calls, with the article text last.
+FULL_PROMPT = PromptTemplate("financial.extract", '''Please retrieve Company Name, Stock Symbol, Revenue, Net Income, Total Assets, EBITDA, Stock Price, earnings per share (EPS) from the given financial text or the news article. If you can't find the information from the text or the news article then return "Not Found". DO NOT MAKE UP ANY INFORMATION.
     For the Stock Symbol, return the ticker symbol of the company. For example, if the company name is "Apple Inc.", then return "AAPL" as the Stock Symbol.
     Always return your response in the below JSON format:
-    {
+    {{
         "Company Name": "Walmart Inc.",
         "Stock Symbol": "WMT",
         "Revenue": "$559.2 billion",
@@ -21,38 +44,256 @@ def get_prompt():
         "EBITDA": "$22.5 billion",
         "Stock Price": "$177.57",
         "Earnings per Share (EPS)": "$5.61"
-    }
+    }}
     News Article: 
     =============
-'''
+{article}''')
+PARTIAL_PROMPT = PromptTemplate("financial.extract_missing", '''Please retrieve {fields} from the given financial news article. If you can't find the information then return "Not Found". DO NOT MAKE UP ANY INFORMATION.{ticker_hint}
+    Always return your response in the below JSON format:
+    {example}
+    News Article:
+    =============
+{article}''')
+TICKER_HINT = '''
+    For the Stock Symbol, return the ticker symbol of the company.'''
+BATCH_PROMPT = PromptTemplate("financial.extract_batch", '''Please retrieve {fields} from EACH of the financial news articles below. If you can't find a value in an article then return "Not Found" for it. DO NOT MAKE UP ANY INFORMATION.{ticker_hint}
+    Each article starts with a line "=== Article <id> ===". Always return a JSON object with one entry per article, using the same ids:
+    {{"articles": [{{"id": "<id>", {example}}}]}}
+
+{articles}''')
+BATCH_TICKER_HINT = '''
+    For the Stock Symbol, return the ticker symbol of the company. For example, if the company name is "Apple Inc.", then return "AAPL" as the Stock Symbol.'''
+
+
+def prompt_template(fields=None):
+    """Template asking for the given fields (all of them by default); compiled once per field set."""
+    if fields is None or len(fields) >= len(FIELDS):
+        return FULL_PROMPT
+    # Smaller prompt asking only for the fields the local rules missed.
+    example = json.dumps({field: EXAMPLE_VALUES[field] for field in fields}, indent=4)
+    ticker_hint = TICKER_HINT if "Stock Symbol" in fields else ""
+    return PARTIAL_PROMPT.partial(fields=", ".join(fields), ticker_hint=ticker_hint, example=example)
+
+
+def batch_prompt_template(fields=None):
+    """Batch template asking for the given fields (all of them by default); compiled once per field set."""
+    fields = FIELDS if fields is None else fields
+    example = ", ".join(f'"{field}": "{EXAMPLE_VALUES[field]}"' for field in fields)
+    ticker_hint = BATCH_TICKER_HINT if "Stock Symbol" in fields else ""
+    return BATCH_PROMPT.partial(fields=", ".join(fields), ticker_hint=ticker_hint, example=example)
 
-def extract_financial_info(text):
-    get_prompt_text = get_prompt() + text
 
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "user", "content": get_prompt_text}
-        ]
-    )
+def get_prompt(fields=None):
+    """Instructions placed before the article text (the template's static prefix)."""
+    return prompt_template(fields).prefix
+
+def record_stats(fields_found_locally, llm_seconds=None, cached=False):
+    with _stats_lock:
+        EXTRACTION_STATS["articles"] += 1
+        EXTRACTION_STATS["fields"] += len(FIELDS)
+        EXTRACTION_STATS["local_fields"] += fields_found_locally
+        if llm_seconds is None:
+            EXTRACTION_STATS["llm_calls_skipped"] += 1
+        elif cached:
+            # Answered from the response cache: no request was sent.
+            EXTRACTION_STATS["llm_cache_hits"] += 1
+        else:
+            EXTRACTION_STATS["llm_calls"] += 1
+            EXTRACTION_STATS["llm_seconds"] += llm_seconds
+
+
+def extraction_summary():
+    """One-line report of the fields resolved locally and the LLM time saved."""
+    with _stats_lock:
+        stats = dict(EXTRACTION_STATS)
+    if not stats["fields"]:
+        return "No extractions yet."
+    summary = f"{stats['local_fields'] / stats['fields']:.0%} of fields resolved locally, {stats['llm_calls_skipped']} of {stats['articles']} LLM call(s) skipped"
+    if stats["llm_calls"]:
+        average = stats["llm_seconds"] / stats["llm_calls"]
+        summary += f" (~{stats['llm_calls_skipped'] * average:.1f}s saved at {average:.2f}s per call)"
+    if stats["llm_cache_hits"]:
+        summary += f", {stats['llm_cache_hits']} answered from the response cache"
+    return summary
+
+
+def extract_financial_info(text, article_id="article"):
+    """
+    Extract the financial fields from one article.
+
+    Returns the same typed wide schema as extract_financial_info_batch(wide=True):
+    a one-row DataFrame (see normalize.build_wide_frame).
+    """
+    # Fields stated in regular phrasing are found by the local rules; only
+    # the rest are sent to the LLM, with a prompt listing just those fields.
+    values = rules.pre_extract(text)
+    missing = [field for field in FIELDS if values[field] is None]
+    if not missing:
+        record_stats(len(FIELDS))
+        return normalize.build_wide_frame([{"Article ID": article_id, **values}], texts={article_id: text})
+
+    # Created on first use and shared: pooled connections, rate-limit
+    # retries and the response cache for re-extracting the same article
+    client = get_client("openai")
+    start = time.perf_counter()
+    response = prompt_template(missing).create(client, {"article": text}, model="gpt-3.5-turbo")
+    record_stats(len(FIELDS) - len(missing), time.perf_counter() - start, getattr(response, "cached", False))
     content = response.choices[0].message.content
-    print("Response from OpenAI:", content)  # Debugging line to see the raw response
+    logger.debug("Response from OpenAI: %s", content)
     try:
         json_object = json.loads(content)
-        return pd.DataFrame(json_object.items(), columns=["Measure", "Value"])
     except json.JSONDecodeError:
-        pass  # Handle the error as needed
+        json_object = {}  # Fields the LLM was asked for are reported as "Not Found"
+    for field in missing:
+        values[field] = json_object.get(field, "Not Found")
+
+    return normalize.build_wide_frame([{"Article ID": article_id, **values}], texts={article_id: text})
+
+
+def get_batch_prompt(articles, fields=None):
+    """Prompt asking for the same fields (all of them by default) from several articles in one request."""
+    return batch_prompt_template(fields).render(articles=_batch_articles(articles))
+
+
+def _batch_articles(articles):
+    return "\n".join(f"=== Article {article_id} ===\n{text.strip()}\n" for article_id, text in articles)
+
+
+def make_batches(articles, batch_size=5, max_chars=12000):
+    """Group (id, text) pairs into batches of at most batch_size articles / max_chars characters."""
+    batch, size = [], 0
+    for article_id, text in articles:
+        if batch and (len(batch) >= batch_size or size + len(text) > max_chars):
+            yield batch
+            batch, size = [], 0
+        batch.append((str(article_id), text))
+        size += len(text)
+    if batch:
+        yield batch
+
+
+def _extract_batch(batch, limiter, fields=FIELDS):
+    limiter.wait()
+    client = get_client("openai")
+    start = time.perf_counter()
+    response = batch_prompt_template(fields).create(client, {"articles": _batch_articles(batch)},
+                                                    model="gpt-3.5-turbo", response_format={"type": "json_object"})
+    try:
+        found = {str(item.get("id")): item for item in json.loads(response.choices[0].message.content)["articles"]}
+    except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+        found = {}
+    # Articles the model skipped or garbled are reported as "Not Found"; fields
+    # that were not asked for are filled in from the local values by the caller.
+    rows = [{"Article ID": article_id, **{field: found.get(article_id, {}).get(field, "Not Found") if field in fields
+                                          else "Not Found" for field in FIELDS}}
+            for article_id, _ in batch]
+    return rows, time.perf_counter() - start, getattr(response, "cached", False)
+
+
+def extract_financial_info_batch(articles, batch_size=5, max_workers=4, requests_per_minute=60, progress=None,
+                                 wide=False):
+    """
+    Extract the financial fields from many articles.
+
+    Several articles are packed into each request and batches run concurrently, with all
+    workers sharing one requests_per_minute budget. progress(done, total) is called after
+    each batch. Returns one DataFrame with columns ["Article ID", "Measure", "Value", "Error"], or
+    with wide=True one typed row per article with numeric values next to the raw strings (see
+    normalize.build_wide_frame). Error is set on the rows of articles whose batch request failed;
+    their fields other than those found locally are "Not Found". Raises ValueError if two articles
+    share an id.
+    """
+    if isinstance(articles, dict):
+        articles = articles.items()
+    articles = [(str(article_id), text) for article_id, text in articles]
+    # Results are matched back to articles by id, so ids must be unique.
+    seen, duplicates = set(), []
+    for article_id, _ in articles:
+        if article_id in seen:
+            duplicates.append(article_id)
+        seen.add(article_id)
+    if duplicates:
+        raise ValueError(f"Duplicate article ids: {', '.join(sorted(set(duplicates)))}")
+
+    # Articles fully resolved by the local rules never reach the LLM.
+    local = {article_id: rules.pre_extract(text) for article_id, text in articles}
+    # The rest are grouped by the fields still missing, so each batch asks
+    # only for those.
+    rows, pending = [], {}
+    for article_id, text in articles:
+        missing = tuple(field for field in FIELDS if local[article_id][field] is None)
+        if not missing:
+            rows.append({"Article ID": article_id, **local[article_id]})
+            record_stats(len(FIELDS))
+        else:
+            pending.setdefault(missing, []).append((article_id, text))
+    batches = [(missing, batch) for missing, group in pending.items() for batch in make_batches(group, batch_size)]
+    total, done = len(articles), len(rows)
+    if progress is not None and done:
+        progress(done, total)
+
+    limiter = RateLimiter(requests_per_minute)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_extract_batch, batch, limiter, missing): batch for missing, batch in batches}
+        for future in as_completed(futures):
+            try:
+                llm_rows, seconds, cached = future.result()
+            except Exception as e:
+                logger.exception("Batch of %d article(s) failed", len(futures[future]))
+                # Marked as failed rather than passed off as "Not Found".
+                llm_rows = [{"Article ID": article_id, **{field: "Not Found" for field in FIELDS},
+                             "Error": f"{type(e).__name__}: {e}"} for article_id, _ in futures[future]]
+                seconds, cached = 0.0, False
+            for row in llm_rows:
+                found = local[row["Article ID"]]
+                record_stats(sum(value is not None for value in found.values()), seconds / len(llm_rows), cached)
+                # Values found locally take precedence over the LLM's.
+                rows.append({**row, **{field: value for field, value in found.items() if value is not None}})
+            done += len(futures[future])
+            if progress is not None:
+                progress(done, total)
+
+    # Keep articles in input order and measures in schema order.
+    order = {article_id: i for i, (article_id, _) in enumerate(articles)}
+    if wide:
+        rows.sort(key=lambda row: order[row["Article ID"]])
+        return normalize.build_wide_frame(rows, texts=dict(articles))
+
+    long = pd.DataFrame(rows, columns=["Article ID", "Error"] + FIELDS).melt(
+        id_vars=["Article ID", "Error"], var_name="Measure", value_name="Value")
+    long["_article"] = long["Article ID"].map(order)
+    long["_measure"] = long["Measure"].map(FIELDS.index)
+    long = long.sort_values(["_article", "_measure"]).drop(columns=["_article", "_measure"]).reset_index(drop=True)
+    return long[["Article ID", "Measure", "Value", "Error"]]
+
 
-    return pd.DataFrame({
-        "Measure": ["Company Name", "Stock Symbol", "Revenue", "Net Income", "Total Assets", "EBITDA", "Stock Price", "EPS"],
-        "Value": ["Not Found"] * 8
-    })
+def load_articles_from_csv(file, text_column=None, id_column=None):
+    """Read (id, text) pairs from a CSV; the text column defaults to "text"/"article"/"content" or the last column."""
+    content = file.read()
+    if isinstance(content, bytes):
+        content = content.decode("utf-8", errors="ignore")
+    reader = csv.DictReader(io.StringIO(content))
+    columns = reader.fieldnames or []
+    text_column = text_column or next((c for c in ("text", "article", "content") if c in columns), columns[-1] if columns else None)
+    id_column = id_column or next((c for c in ("id", "article_id") if c in columns), None)
+    return [(row[id_column] if id_column else str(i), row[text_column] or "") for i, row in enumerate(reader, 1)]
 
 
+def load_articles_from_zip(file):
+    """Read (id, text) pairs from the .txt files of a ZIP archive; the id is the path inside the archive."""
+    articles = []
+    with zipfile.ZipFile(file) as archive:
+        for name in sorted(archive.namelist()):
+            if name.lower().endswith(".txt") and not name.startswith("__MACOSX/"):
+                articles.append((name, archive.read(name).decode("utf-8", errors="ignore")))
+    return articles
 
 
 if __name__ == "__main__":
     text = '''
     Apple Inc. reported a revenue of $365.8 billion for the fiscal year 2021, with a net income of $94.7 billion. The company's total assets stood at $351 billion, and its EBITDA was $112.4 billion. As of December 31, 2021, Apple's stock price was $177.57, and its earnings per share (EPS) were $5.61.
     '''
-    data = extract_financial_info(text)
\ No newline at end of file
+    data = extract_financial_info(text)
+    print(data.T)
+    print(extraction_summary())
+    print(format_prompt_stats())
\ No newline at end of file
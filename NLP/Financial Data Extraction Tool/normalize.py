@@ -0,0 +1,156 @@
+import math
+import os
+import re
+import uuid
+
+import numpy as np
+import pandas as pd
+
+SCALES = {
+    "thousand": 1e3, "k": 1e3,
+    "million": 1e6, "mn": 1e6, "m": 1e6, "mm": 1e6,
+    "billion": 1e9, "bn": 1e9, "b": 1e9,
+    "trillion": 1e12, "tn": 1e12, "t": 1e12,
+}
+CURRENCY_SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "₹": "INR"}
+
+AMOUNT_PATTERN = re.compile(
+    r"(?<![\w.])(?P<neg>[-−(])?\s*(?P<code>USD|EUR|GBP|JPY|INR|CAD|AUD)?\s*(?P<symbol>[$€£¥₹])?\s*(?P<neg2>[-−])?\s*"
+    r"(?P<number>\d[\d,]*(?:\.\d+)?)\s*(?P<scale>thousand|million|billion|trillion|bn|mn|mm|tn|[kmbt])?\b",
+    re.IGNORECASE,
+)
+# A second bound right after an amount: "$5-6 billion", "$5 billion to $6 billion".
+RANGE_PATTERN = re.compile(r"\s*(?:[-–—]|to\b)\s*(?:USD|EUR|GBP|JPY|INR|CAD|AUD)?\s*[$€£¥₹]?\s*\d", re.IGNORECASE)
+PERIOD_PATTERN = re.compile(
+    r"\b(?:(?P<q>Q[1-4])\s*(?:FY\s*)?(?P<qy>(?:19|20)\d{2})"
+    r"|(?P<qword>first|second|third|fourth)\s+quarter(?:\s+of)?(?:\s+(?:fiscal\s+)?(?:year\s+)?(?P<qwy>(?:19|20)\d{2}))?"
+    r"|(?:fiscal\s+(?:year\s+)?|FY\s*)(?P<fy>(?:19|20)\d{2}))",
+    re.IGNORECASE,
+)
+QUARTER_WORDS = {"first": "Q1", "second": "Q2", "third": "Q3", "fourth": "Q4"}
+
+# Measure -> column name in the wide schema. Per-share values are not scaled.
+NUMERIC_FIELDS = {
+    "Revenue": "revenue",
+    "Net Income": "net_income",
+    "Total Assets": "total_assets",
+    "EBITDA": "ebitda",
+    "Stock Price": "stock_price",
+    "Earnings per Share (EPS)": "eps",
+}
+
+
+def parse_amount(raw):
+    """
+    Parse a money string such as "$559.2 billion" or "(€3.1m)".
+
+    The first amount with a currency symbol or code wins, so labels such as
+    "Q3" or "2021:" in front of it are skipped; a bare number is used only
+    when no amount has a currency (e.g. an EPS of "5.61").
+
+    Returns:
+        tuple: (value as float, ISO currency code or None). The value is NaN
+        when nothing numeric is found (e.g. "Not Found") or the amount is a
+        range such as "$5-6 billion"; the raw string keeps both bounds.
+    """
+    if isinstance(raw, (int, float)) and not isinstance(raw, bool):
+        # The LLM sometimes answers with a JSON number instead of a string.
+        return float(raw), None
+    if not isinstance(raw, str):
+        return math.nan, None
+    matches = list(AMOUNT_PATTERN.finditer(raw))
+    if not matches:
+        return math.nan, None
+    match = next((m for m in matches if m.group("code") or m.group("symbol")), matches[0])
+    currency = match.group("code") or CURRENCY_SYMBOLS.get(match.group("symbol"))
+    currency = currency.upper() if currency else None
+    if RANGE_PATTERN.match(raw, match.end()):
+        return math.nan, currency
+    value = float(match.group("number").replace(",", ""))
+    scale = match.group("scale")
+    if scale:
+        value *= SCALES[scale.lower()]
+    if match.group("neg") or match.group("neg2"):
+        value = -value
+    return value, currency
+
+
+def find_period(text):
+    """
+    Find the reporting period of an article, e.g. "FY2021" or "Q3 2023".
+
+    Returns:
+        str or None: Normalized period label.
+    """
+    match = PERIOD_PATTERN.search(text or "")
+    if not match:
+        return None
+    if match.group("q"):
+        return f"{match.group('q').upper()} {match.group('qy')}"
+    if match.group("qword"):
+        quarter = QUARTER_WORDS[match.group("qword").lower()]
+        return f"{quarter} {match.group('qwy')}" if match.group("qwy") else quarter
+    return f"FY{match.group('fy')}"
+
+
+def _text_or_none(value):
+    return None if value in (None, "", "Not Found") else str(value)
+
+
+def build_wide_frame(rows, texts=None):
+    """
+    Turn extraction results into one typed, wide DataFrame.
+
+    Columns are built as whole arrays (one per field) and the frame is
+    created once, instead of building a DataFrame per article. Each money
+    field gets a float64 column (scaled to units) next to its raw string
+    (<name>_raw); currency is taken from the first field that has one.
+
+    Args:
+        rows (list): Dicts with an "Article ID" key and the extraction fields.
+        texts (dict, optional): {article_id: text} used to detect the period.
+
+    Returns:
+        pd.DataFrame: article_id, company_name, stock_symbol, period,
+        currency, then <measure> (float64) and <measure>_raw (string), and
+        error (string, set when the row's extraction failed).
+    """
+    n = len(rows)
+    columns = {
+        "article_id": pd.array([str(row.get("Article ID", i)) for i, row in enumerate(rows)], dtype="string"),
+        "company_name": pd.array([_text_or_none(row.get("Company Name")) for row in rows], dtype="string"),
+        "stock_symbol": pd.array([_text_or_none(row.get("Stock Symbol")) for row in rows], dtype="string"),
+        "period": pd.array([find_period(texts.get(str(row.get("Article ID")), "")) if texts else None
+                            for row in rows], dtype="string"),
+    }
+    currencies = [None] * n
+    numeric = {}
+    for field, name in NUMERIC_FIELDS.items():
+        raw = [row.get(field) for row in rows]
+        values = np.empty(n, dtype=np.float64)
+        for i, item in enumerate(raw):
+            values[i], currency = parse_amount(item)
+            if currencies[i] is None:
+                currencies[i] = currency
+        numeric[name] = values
+        numeric[name + "_raw"] = pd.array([_text_or_none(item) for item in raw], dtype="string")
+    columns["currency"] = pd.array(currencies, dtype="string")
+    columns.update(numeric)
+    columns["error"] = pd.array([_text_or_none(row.get("Error")) for row in rows], dtype="string")
+    return pd.DataFrame(columns)
+
+
+def append_parquet(df, directory):
+    """
+    Append a wide frame to a Parquet dataset directory.
+
+    Each call writes one new part file, so nothing already written is
+    rewritten; read everything back with pd.read_parquet(directory).
+
+    Returns:
+        str: Path of the part file written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet")
+    df.to_parquet(path, index=False)
+    return path
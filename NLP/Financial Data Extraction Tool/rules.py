@@ -0,0 +1,154 @@
+import re
+
+# Known companies and their ticker symbols. Extend as needed; lookups are
+# case-sensitive (so "oracle" the word is not Oracle) and match the longest
+# name first.
+COMPANY_TICKERS = {
+    "Apple Inc.": "AAPL",
+    "Microsoft Corporation": "MSFT",
+    "Alphabet Inc.": "GOOGL",
+    "Amazon.com, Inc.": "AMZN",
+    "Meta Platforms, Inc.": "META",
+    "Tesla, Inc.": "TSLA",
+    "NVIDIA Corporation": "NVDA",
+    "Berkshire Hathaway Inc.": "BRK.B",
+    "JPMorgan Chase & Co.": "JPM",
+    "Johnson & Johnson": "JNJ",
+    "Visa Inc.": "V",
+    "Walmart Inc.": "WMT",
+    "Exxon Mobil Corporation": "XOM",
+    "The Procter & Gamble Company": "PG",
+    "Mastercard Incorporated": "MA",
+    "The Home Depot, Inc.": "HD",
+    "Chevron Corporation": "CVX",
+    "The Coca-Cola Company": "KO",
+    "PepsiCo, Inc.": "PEP",
+    "Pfizer Inc.": "PFE",
+    "Intel Corporation": "INTC",
+    "Netflix, Inc.": "NFLX",
+    "Oracle Corporation": "ORCL",
+    "Salesforce, Inc.": "CRM",
+    "Adobe Inc.": "ADBE",
+    "The Walt Disney Company": "DIS",
+    "Nike, Inc.": "NKE",
+    "Costco Wholesale Corporation": "COST",
+    "International Business Machines Corporation": "IBM",
+    "Cisco Systems, Inc.": "CSCO",
+}
+
+# Short names people actually write in press releases.
+COMPANY_ALIASES = {
+    "Apple": "Apple Inc.",
+    "Microsoft": "Microsoft Corporation",
+    "Alphabet": "Alphabet Inc.",
+    "Google": "Alphabet Inc.",
+    "Amazon": "Amazon.com, Inc.",
+    "Meta": "Meta Platforms, Inc.",
+    "Tesla": "Tesla, Inc.",
+    "NVIDIA": "NVIDIA Corporation",
+    "JPMorgan": "JPMorgan Chase & Co.",
+    "Walmart": "Walmart Inc.",
+    "ExxonMobil": "Exxon Mobil Corporation",
+    "Exxon Mobil": "Exxon Mobil Corporation",
+    "Procter & Gamble": "The Procter & Gamble Company",
+    "Home Depot": "The Home Depot, Inc.",
+    "Chevron": "Chevron Corporation",
+    "Coca-Cola": "The Coca-Cola Company",
+    "PepsiCo": "PepsiCo, Inc.",
+    "Pfizer": "Pfizer Inc.",
+    "Intel": "Intel Corporation",
+    "Netflix": "Netflix, Inc.",
+    "Oracle": "Oracle Corporation",
+    "Salesforce": "Salesforce, Inc.",
+    "Adobe": "Adobe Inc.",
+    "Disney": "The Walt Disney Company",
+    "Nike": "Nike, Inc.",
+    "Costco": "Costco Wholesale Corporation",
+    "IBM": "International Business Machines Corporation",
+    "Cisco": "Cisco Systems, Inc.",
+}
+
+_NAMES = sorted(set(COMPANY_TICKERS) | set(COMPANY_ALIASES), key=len, reverse=True)
+COMPANY_PATTERN = re.compile(r"(?<![\w])(" + "|".join(re.escape(n) for n in _NAMES) + r")(?![\w])")
+_CANONICAL = {name: COMPANY_ALIASES.get(name, name) for name in _NAMES}
+_TICKER_COMPANIES = {ticker: name for name, ticker in COMPANY_TICKERS.items()}
+
+GENERIC_COMPANY_PATTERN = re.compile(
+    r"\b((?:[A-Z][\w&\-]*\.?,?\s){1,4}(?:Inc\.|Corp\.|Corporation|Ltd\.|Limited|plc|PLC|Co\.|Company|Group|Holdings))"
+)
+TICKER_PATTERN = re.compile(r"\((?:NASDAQ|NYSE|Nasdaq|NYSE American|TSX|LSE)\s*:\s*([A-Z][A-Z.]{0,5})\)")
+
+# A dollar amount with an optional scale word, e.g. "$559.2 billion" or "$5.61".
+MONEY = r"\$\s?\d[\d,]*(?:\.\d+)?(?:\s?(?:trillion|billion|million|thousand|bn|mn|tn)\b)?"
+# Up to 80 characters between the label and the amount, without crossing
+# a sentence boundary or another dollar amount.
+GAP = r"(?:(?!\.\s)[^$;]){0,80}?"
+
+FIELD_PATTERNS = {
+    "Revenue": re.compile(r"\b(?:total\s+)?(?:revenues?|net\s+sales|total\s+sales)\b" + GAP + "(" + MONEY + ")", re.IGNORECASE),
+    "Net Income": re.compile(r"\bnet\s+(?:income|profit|earnings)\b(?!\s+per)" + GAP + "(" + MONEY + ")", re.IGNORECASE),
+    "Total Assets": re.compile(r"\btotal\s+assets\b" + GAP + "(" + MONEY + ")", re.IGNORECASE),
+    "EBITDA": re.compile(r"\b(?:adjusted\s+)?EBITDA\b" + GAP + "(" + MONEY + ")", re.IGNORECASE),
+    "Stock Price": re.compile(
+        r"\b(?:stock|share)\s+price\b" + GAP + "(" + MONEY + ")"
+        r"|\bshares?\s+(?:closed|traded|ended|finished)\s+(?:at|up at|down at)\s+(" + MONEY + ")",
+        re.IGNORECASE),
+    "Earnings per Share (EPS)": re.compile(
+        r"\b(?:(?:diluted\s+)?earnings\s+per\s+(?:diluted\s+)?share|(?:diluted\s+)?EPS)\b" + GAP + "(" + MONEY + ")",
+        re.IGNORECASE),
+}
+
+
+def _known_companies(text):
+    # Canonical names of the known companies mentioned, in order of appearance.
+    return list(dict.fromkeys(_CANONICAL[m.group(1)] for m in COMPANY_PATTERN.finditer(text)))
+
+
+def find_company(text):
+    """
+    Return (company name, ticker) found in the text; either may be None.
+
+    An exchange ticker such as "(NASDAQ: AAPL)" is the strongest signal,
+    then the first formal name ("... Inc.", "... Co."), then a known short
+    name. When the clues point to different companies (e.g. a formal name
+    and another company mentioned in passing, or two known companies), the
+    company is left as None so the LLM decides.
+    """
+    ticker_match = TICKER_PATTERN.search(text)
+    ticker = ticker_match.group(1) if ticker_match else None
+    match = GENERIC_COMPANY_PATTERN.search(text)
+    formal = match.group(1).strip().rstrip(",") if match else None
+
+    if ticker:
+        name = _TICKER_COMPANIES.get(ticker)
+        if name is None and formal and not _known_companies(formal):
+            name = formal
+        return name, ticker
+
+    mentioned = _known_companies(text)
+    if formal:
+        known = _known_companies(formal)
+        if len(known) == 1:
+            return known[0], COMPANY_TICKERS[known[0]]
+        if not known and not mentioned:
+            return formal, None
+        return None, None
+
+    if len(mentioned) == 1:
+        return mentioned[0], COMPANY_TICKERS[mentioned[0]]
+    return None, None
+
+
+def pre_extract(text):
+    """
+    Extract the fields of get_prompt()'s schema with regex rules only.
+
+    Returns a dict with every field; values not found are None so the
+    caller knows which ones still need the LLM.
+    """
+    company, ticker = find_company(text)
+    result = {"Company Name": company, "Stock Symbol": ticker}
+    for field, pattern in FIELD_PATTERNS.items():
+        match = pattern.search(text)
+        result[field] = next((g for g in match.groups() if g), None) if match else None
+    return result
@@ -1,29 +1,139 @@
-from flask import Flask, render_template, request
+import functools
+import io
+import json
+import os
+import time
+
+from flask import Flask, jsonify, render_template, request
 from markupsafe import Markup
-import spacy
-from spacy import displacy
+from spacy.displacy.render import DEFAULT_LABEL_COLORS
+
+import ner
+from serving import QueueFull, RequestQueue
+
+nlp = ner.load_model()
+
+# Defaults and upper limits of the batch endpoint's batch_size/n_process;
+# requests can ask for less, never more. NER_N_PROCESS=-1 means every core.
+BATCH_SIZE = max(1, int(os.getenv("NER_BATCH_SIZE", "64")))
+N_PROCESS = int(os.getenv("NER_N_PROCESS", "1"))
+if N_PROCESS < 1:
+    N_PROCESS = os.cpu_count() or 1
+
+def clamp(value, maximum):
+    """Limit a per-request setting to 1..maximum; 0 or less means the maximum."""
+    return maximum if value is None or value < 1 else min(value, maximum)
+
+def make_cache():
+    # NER_CACHE_PATH adds a SQLite tier so results survive restarts.
+    return ner.EntityCache(nlp, path=os.getenv("NER_CACHE_PATH") or None,
+                           max_memory_entries=int(os.getenv("NER_CACHE_ENTRIES", "1024")))
+
+cache = make_cache()
+
+# NER_WORKER_THREADS requests run the pipeline at once per process, up to
+# NER_MAX_QUEUE more wait for a slot, and the rest get 503.
+request_queue = RequestQueue(workers=int(os.getenv("NER_WORKER_THREADS", "2")),
+                             max_waiting=int(os.getenv("NER_MAX_QUEUE", "8")),
+                             timeout=float(os.getenv("NER_QUEUE_TIMEOUT", "10")))
 
-nlp = spacy.load('en_core_web_sm')
+def init_worker():
+    """Called in each forked server worker: the model is shared copy-on-write
+    with the parent, but the cache's SQLite connection must not be."""
+    global cache
+    cache = make_cache()
 
 app = Flask(__name__)
+# Keep JSON responses compact even when debug mode would pretty-print them.
+app.json.compact = True
+
+@app.context_processor
+def label_colors():
+    return {'label_colors': Markup(json.dumps(DEFAULT_LABEL_COLORS))}
+
+@app.errorhandler(QueueFull)
+def queue_full(error):
+    return jsonify({'error': str(error)}), 503, {'Retry-After': '1'}
+
+def queued(view):
+    """Run a view in one of the request queue's worker slots."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with request_queue.slot():
+            return view(*args, **kwargs)
+    return wrapper
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/entity', methods=['POST', 'GET'])
+@queued
 def entity():
     if request.method == 'POST':
         file = request.files['file']
         if file:
-            readable_file = file.read().decode('utf-8', errors='ignore')
-            docs = nlp(readable_file)
-            docs_html = Markup(displacy.render(docs, style='ent', jupyter=False, options={'distance': 90}))
+            readable_file, entities = ner.extract_entities_cached(nlp, file.stream, cache)
+            docs_html = Markup(ner.render_entities(readable_file, entities, options={'distance': 90}))
             return render_template('index.html', html=docs_html, text=readable_file)
         else:
             return render_template('index.html', html=None, text=None)
     else:
         return render_template('index.html', html=None, text=None)
 
+@app.route('/api/entities', methods=['POST'])
+@queued
+def api_entities():
+    """
+    Return entities of one uploaded file (form field "file", or the raw
+    request body) as compact spans: {"labels": [...], "spans": [[start,
+    end, label index], ...], "length", "text"}. Pass text=0 to leave the
+    text out when the client already has it.
+    """
+    file = request.files.get('file')
+    stream = file.stream if file else io.BytesIO(request.get_data())
+    text, entities = ner.extract_entities_cached(nlp, stream, cache)
+    labels, spans = ner.compact_spans(entities)
+    result = {'labels': labels, 'spans': spans, 'length': len(text)}
+    if request.args.get('text', '1') != '0':
+        result['text'] = text
+    return jsonify(result)
+
+@app.route('/entity/batch', methods=['POST'])
+@queued
+def entity_batch():
+    """
+    Run NER over many documents: several "files" fields, a ZIP of .txt
+    files, or a JSONL file with one {"id", "text"} per line. batch_size and
+    n_process can be lowered with query or form parameters; they are capped
+    at NER_BATCH_SIZE and NER_N_PROCESS.
+    """
+    documents = ner.read_uploaded_documents(request.files.getlist('files') + request.files.getlist('file'))
+    if not documents:
+        return jsonify({'error': 'No documents uploaded'}), 400
+    batch_size = clamp(request.values.get('batch_size', BATCH_SIZE, type=int), BATCH_SIZE)
+    n_process = clamp(request.values.get('n_process', N_PROCESS, type=int), N_PROCESS)
+
+    start = time.perf_counter()
+    results = ner.extract_entities_batch(nlp, documents, batch_size=batch_size, n_process=n_process, cache=cache)
+    elapsed = time.perf_counter() - start
+    return jsonify({
+        'documents': results,
+        'count': len(results),
+        'seconds': round(elapsed, 3),
+        'docs_per_second': round(len(results) / elapsed, 1) if elapsed else None,
+    })
+
+@app.route('/health')
+def health():
+    """Liveness check; answers without waiting for a worker slot."""
+    return jsonify({'status': 'ok', 'model': ner.model_id(nlp), 'pid': os.getpid(),
+                    'queue': request_queue.stats()})
+
+@app.route('/stats')
+def stats():
+    """Result cache hit rates and sizes, and the model they belong to."""
+    return jsonify({'model': ner.model_id(nlp), 'cache': cache.stats(), 'queue': request_queue.stats()})
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,36 @@
+# Production server for the NER app:
+#   gunicorn -c gunicorn.conf.py app:app
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv("NER_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("NER_WORKERS", multiprocessing.cpu_count()))
+
+# Load the spaCy model once in the master; forked workers share its memory
+# copy-on-write instead of each loading their own copy.
+preload_app = True
+
+# Each worker runs NER_WORKER_THREADS requests through the pipeline and
+# queues NER_MAX_QUEUE more (see RequestQueue). gunicorn would otherwise
+# queue connections that find no free thread without limit, so extra
+# threads are started whose only job is to answer the overflow with 503.
+worker_class = "gthread"
+threads = (int(os.getenv("NER_WORKER_THREADS", "2")) + int(os.getenv("NER_MAX_QUEUE", "8"))
+           + int(os.getenv("NER_OVERFLOW_THREADS", "16")))
+backlog = 128
+timeout = 120
+graceful_timeout = 30
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far (the model included) out of the garbage
+    # collector's generations, so collections in the workers do not write to
+    # those pages and break copy-on-write sharing.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import app
+
+    app.init_worker()
@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from llm_common.latency import LatencyTracker
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_TEXT = (
+    "Apple Inc. reported record revenue on Thursday, and Tim Cook told analysts in Cupertino that "
+    "demand in Europe and China remained strong. Microsoft and Google announced new data centers "
+    "in London and Frankfurt, while the European Commission opened an inquiry in Brussels.\n\n"
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_healthy(base_url, timeout=120.0):
+    """Poll /health until the server answers."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(base_url + "/health", timeout=2) as response:
+                return json.load(response)
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become healthy")
+
+
+def start_server(workers, port):
+    """Start gunicorn with the given number of workers; returns the process."""
+    env = dict(os.environ, NER_WORKERS=str(workers), NER_BIND=f"127.0.0.1:{port}")
+    return subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+                            cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def post(url, body):
+    """POST a document; returns (status code, seconds)."""
+    request = urllib.request.Request(url, data=body, method="POST", headers={"Content-Type": "text/plain"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - start
+
+
+def run_load(base_url, bodies, concurrency):
+    """
+    Send every body to /api/entities with `concurrency` clients in parallel.
+
+    Returns:
+        dict: Requests per second, status code counts and the LatencyTracker
+        of successful requests.
+    """
+    url = base_url + "/api/entities?text=0"
+    tracker = LatencyTracker()
+    statuses = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for status, seconds in pool.map(lambda body: post(url, body), bodies):
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                tracker.record(seconds)
+    elapsed = time.perf_counter() - start
+    return {"rps": statuses.get(200, 0) / elapsed, "statuses": statuses, "latency": tracker, "elapsed": elapsed}
+
+
+def make_bodies(text, requests, same=False):
+    # Distinct bodies by default so the result cache does not answer them.
+    if same:
+        return [text.encode("utf-8")] * requests
+    return [f"{text}Request {i}.".encode("utf-8") for i in range(requests)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the NER app at different worker counts.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="gunicorn worker counts to try")
+    parser.add_argument("--url", help="Test an already running server instead of starting gunicorn")
+    parser.add_argument("-n", "--requests", type=int, default=200, help="Requests per run")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="Parallel clients")
+    parser.add_argument("--file", help="Document to send (default: a generated news text)")
+    parser.add_argument("--paragraphs", type=int, default=20, help="Size of the generated text")
+    parser.add_argument("--same", action="store_true", help="Send identical bodies (measures cache hits)")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = SAMPLE_TEXT * args.paragraphs
+    bodies = make_bodies(text, args.requests, args.same)
+
+    runs = [(None, args.url)] if args.url else [(w, None) for w in args.workers]
+    for workers, url in runs:
+        server = None
+        if url is None:
+            port = free_port()
+            server = start_server(workers, port)
+            url = f"http://127.0.0.1:{port}"
+        try:
+            wait_healthy(url)
+            post(url + "/api/entities?text=0", bodies[0])  # warm-up
+            result = run_load(url, bodies, args.concurrency)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+        label = f"{workers} worker(s)" if workers else url
+        print(f"{label}: {result['rps']:.1f} req/s, statuses {result['statuses']}")
+        print("  " + result["latency"].report("Latency"))
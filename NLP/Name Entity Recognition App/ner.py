@@ -0,0 +1,341 @@
+import codecs
+import hashlib
+import json
+import os
+import re
+import sys
+import zipfile
+
+import spacy
+from spacy import displacy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from llm_common.cache import ResponseCache
+
+MODEL_NAME = os.getenv("SPACY_MODEL", "en_core_web_sm")
+
+# Texts longer than this are split before going through the pipeline, so
+# memory stays bounded and nlp.max_length is never hit.
+MAX_CHUNK_CHARS = int(os.getenv("NER_MAX_CHUNK_CHARS", "100000"))
+SENTENCE_END = re.compile(r"[.!?][\"')\]]*\s")
+
+# Pipeline components entity recognition depends on; everything else
+# (tagger, parser, lemmatizer, ...) is skipped for speed.
+NER_COMPONENTS = {"tok2vec", "ner", "entity_ruler"}
+
+
+def load_model(name=MODEL_NAME):
+    """Load a spaCy pipeline by package name or path."""
+    return spacy.load(name)
+
+
+def unused_components(nlp):
+    """Names of the pipeline components NER does not need."""
+    return [name for name in nlp.pipe_names if name not in NER_COMPONENTS]
+
+
+def doc_entities(doc, offset=0):
+    """
+    Args:
+        doc (Doc): Processed document (or chunk of one).
+        offset (int): Character offset of the chunk in the full text.
+
+    Returns:
+        list: {"text", "start", "end", "label"} per entity, with character offsets.
+    """
+    return [{"text": ent.text, "start": ent.start_char + offset, "end": ent.end_char + offset,
+             "label": ent.label_} for ent in doc.ents]
+
+
+def _find_cut(text, max_chars):
+    # Prefer a paragraph break, then a sentence end, then any whitespace,
+    # in the second half of the window; cut hard only as a last resort.
+    floor = max_chars // 2
+    cut = text.rfind("\n\n", floor, max_chars)
+    if cut != -1:
+        return cut + 2
+    ends = [m.end() for m in SENTENCE_END.finditer(text, floor, max_chars)]
+    if ends:
+        return ends[-1]
+    for i in range(max_chars - 1, floor - 1, -1):
+        if text[i].isspace():
+            return i + 1
+    return max_chars
+
+
+def iter_text_chunks(blocks, max_chars=MAX_CHUNK_CHARS):
+    """
+    Split text into chunks of at most max_chars on paragraph or sentence
+    boundaries.
+
+    The chunks concatenate back to exactly the input text.
+
+    Args:
+        blocks (str or iterable): The text, or an iterable of consecutive
+            pieces of it (e.g. from iter_decoded_blocks) so it never has to
+            be held in memory at once.
+        max_chars (int): Maximum chunk length.
+
+    Yields:
+        tuple: (offset, chunk) with the chunk's character offset.
+    """
+    if isinstance(blocks, str):
+        blocks = [blocks]
+    buffer, offset = "", 0
+    for block in blocks:
+        buffer += block
+        while len(buffer) > max_chars:
+            cut = _find_cut(buffer, max_chars)
+            yield offset, buffer[:cut]
+            buffer, offset = buffer[cut:], offset + cut
+    if buffer:
+        yield offset, buffer
+
+
+def iter_decoded_blocks(stream, block_size=1 << 16):
+    """Read a binary stream as UTF-8 text in blocks, ignoring invalid bytes."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    while True:
+        data = stream.read(block_size)
+        if not data:
+            break
+        yield decoder.decode(data)
+    yield decoder.decode(b"", final=True)
+
+
+def extract_entities_chunked(nlp, chunks, batch_size=8):
+    """
+    Run NER over the chunks of one text and map entities back to offsets
+    in the full text.
+
+    Only one batch of chunks is in the pipeline at a time, so memory
+    depends on the chunk size, not on the length of the text.
+
+    Args:
+        nlp (Language): Loaded spaCy pipeline.
+        chunks (iterable): (offset, chunk) pairs from iter_text_chunks.
+        batch_size (int): Chunks per batch sent through the pipeline.
+
+    Yields:
+        dict: Entities in document order, as returned by doc_entities.
+    """
+    pairs = ((chunk, offset) for offset, chunk in chunks)
+    for doc, offset in nlp.pipe(pairs, as_tuples=True, batch_size=batch_size, disable=unused_components(nlp)):
+        yield from doc_entities(doc, offset)
+
+
+def extract_entities_from_stream(nlp, stream, max_chars=MAX_CHUNK_CHARS):
+    """
+    Read an uploaded file chunk by chunk and run NER over it.
+
+    Returns:
+        tuple: (full text, list of entities).
+    """
+    pieces = []
+
+    def read_chunks():
+        for offset, chunk in iter_text_chunks(iter_decoded_blocks(stream), min(max_chars, nlp.max_length)):
+            pieces.append(chunk)
+            yield offset, chunk
+
+    entities = list(extract_entities_chunked(nlp, read_chunks()))
+    return "".join(pieces), entities
+
+
+def compact_spans(entities):
+    """
+    Encode entities compactly for the JSON API.
+
+    Returns:
+        tuple: (labels, spans) where labels lists each label once and spans
+        is [[start, end, label index], ...] in document order.
+    """
+    labels, index, spans = [], {}, []
+    for ent in entities:
+        label = ent["label"]
+        if label not in index:
+            index[label] = len(labels)
+            labels.append(label)
+        spans.append([ent["start"], ent["end"], index[label]])
+    return labels, spans
+
+
+def expand_spans(labels, spans, text):
+    """Inverse of compact_spans: rebuild entity dicts from spans and the text."""
+    return [{"text": text[start:end], "start": start, "end": end, "label": labels[label]}
+            for start, end, label in spans]
+
+
+def model_id(nlp):
+    """Name and version of a pipeline, e.g. "en_core_web_sm-3.8.0/spacy-3.8.16"."""
+    meta = nlp.meta
+    return f"{meta.get('lang', 'xx')}_{meta.get('name', 'pipeline')}-{meta.get('version', '0')}/spacy-{spacy.__version__}"
+
+
+class EntityCache:
+    """
+    Cache of NER results keyed on the document's content hash and the
+    model name and version, so re-uploaded documents skip the pipeline.
+
+    Entities are stored as compact spans in a ResponseCache: an in-memory
+    LRU, plus a SQLite file when path is given.
+    """
+
+    def __init__(self, nlp, path=None, max_memory_entries=1024, max_chars=MAX_CHUNK_CHARS):
+        self.cache = ResponseCache(path, max_memory_entries=max_memory_entries, ttl=None)
+        self.max_chars = min(max_chars, nlp.max_length)
+        # Chunking can shift entities at chunk edges, so the chunk size is part of the key.
+        self.prefix = f"ner:{model_id(nlp)}:{self.max_chars}:"
+
+    def key(self, digest):
+        return self.prefix + digest
+
+    def get_spans(self, digest):
+        """Cached (labels, spans) for a document, or None on a miss."""
+        value = self.cache.get(self.key(digest))
+        return None if value is None else json.loads(value)
+
+    def get(self, digest, text):
+        """Cached entities for a document, or None on a miss."""
+        cached = self.get_spans(digest)
+        return None if cached is None else expand_spans(*cached, text)
+
+    def put(self, digest, entities):
+        self.cache.put(self.key(digest), json.dumps(compact_spans(entities), separators=(",", ":")))
+
+    def stats(self):
+        return self.cache.stats()
+
+
+def hash_text(text):
+    """SHA-256 of a document's UTF-8 bytes."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def hash_stream(stream, block_size=1 << 16):
+    """SHA-256 of a seekable binary stream; the stream is rewound afterwards."""
+    digest = hashlib.sha256()
+    for block in iter(lambda: stream.read(block_size), b""):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def extract_entities_cached(nlp, stream, cache=None):
+    """
+    Like extract_entities_from_stream, but answered from cache when the
+    same content has been processed before.
+
+    The upload is hashed block by block first. On a miss it is rewound and
+    run through extract_entities_from_stream, so it is never decoded into
+    one string before chunking; on a hit it is only decoded.
+
+    Args:
+        nlp (Language): Loaded spaCy pipeline.
+        stream: Seekable binary stream of the upload.
+        cache (EntityCache, optional): Result cache; None always runs NER.
+
+    Returns:
+        tuple: (full text, list of entities).
+    """
+    if cache is None:
+        return extract_entities_from_stream(nlp, stream)
+    digest = hash_stream(stream)
+    cached = cache.get_spans(digest)
+    if cached is None:
+        text, entities = extract_entities_from_stream(nlp, stream, cache.max_chars)
+        cache.put(digest, entities)
+        return text, entities
+    text = "".join(iter_decoded_blocks(stream))
+    return text, expand_spans(*cached, text)
+
+
+def render_entities(text, entities, options=None):
+    """
+    Render entity spans with displaCy, as displacy.render(doc, style="ent")
+    would for a single Doc of the whole text.
+    """
+    spans = [{"start": ent["start"], "end": ent["end"], "label": ent["label"]} for ent in entities]
+    return displacy.render({"text": text, "ents": spans, "title": None}, style="ent", manual=True,
+                           jupyter=False, options=options or {})
+
+
+def extract_entities_batch(nlp, documents, batch_size=64, n_process=1, max_chars=MAX_CHUNK_CHARS, cache=None):
+    """
+    Run NER over many documents with nlp.pipe.
+
+    Documents longer than max_chars are split into chunks that go through
+    the pipeline separately; their entities are stitched back together.
+    Documents found in the cache skip the pipeline.
+
+    Args:
+        nlp (Language): Loaded spaCy pipeline.
+        documents (iterable): (doc_id, text) pairs.
+        batch_size (int): Texts per batch sent through the pipeline.
+        n_process (int): Worker processes; -1 uses every CPU core.
+        max_chars (int): Maximum chunk length.
+        cache (EntityCache, optional): Result cache.
+
+    Returns:
+        list: {"id", "entities"} per document, in input order.
+    """
+    max_chars = cache.max_chars if cache is not None else min(max_chars, nlp.max_length)
+    results, misses = [], []
+    for doc_id, text in documents:
+        digest = hash_text(text) if cache is not None else None
+        entities = cache.get(digest, text) if cache is not None else None
+        if entities is None:
+            misses.append((len(results), text, digest))
+        results.append({"id": doc_id, "entities": entities})
+
+    def pieces():
+        for index, text, _ in misses:
+            chunks = list(iter_text_chunks(text, max_chars)) or [(0, "")]
+            for i, (offset, chunk) in enumerate(chunks):
+                yield chunk, (index, offset, i == len(chunks) - 1)
+
+    entities = []
+    for doc, (index, offset, last) in nlp.pipe(pieces(), as_tuples=True, batch_size=batch_size,
+                                               n_process=n_process, disable=unused_components(nlp)):
+        entities.extend(doc_entities(doc, offset))
+        if last:
+            results[index]["entities"] = entities
+            entities = []
+    if cache is not None:
+        for index, _, digest in misses:
+            cache.put(digest, results[index]["entities"])
+    return results
+
+
+def read_uploaded_documents(files):
+    """
+    Turn uploaded files into (doc_id, text) pairs.
+
+    A .zip contributes each .txt file it contains, a .jsonl contributes one
+    document per line ("id" plus "text"), and any other file is a single
+    document named after the file.
+
+    Args:
+        files (list): werkzeug FileStorage objects (anything with .filename
+            and .read()).
+
+    Returns:
+        list: (doc_id, text) pairs.
+    """
+    documents = []
+    for file in files:
+        name = file.filename or "upload"
+        lower = name.lower()
+        if lower.endswith(".zip"):
+            with zipfile.ZipFile(file) as archive:
+                for member in sorted(archive.namelist()):
+                    if member.lower().endswith(".txt") and not member.startswith("__MACOSX/"):
+                        documents.append((member, archive.read(member).decode("utf-8", errors="ignore")))
+        elif lower.endswith(".jsonl"):
+            for line_number, line in enumerate(file.read().decode("utf-8", errors="ignore").splitlines(), 1):
+                if line.strip():
+                    record = json.loads(line)
+                    documents.append((str(record.get("id", f"{name}:{line_number}")), record.get("text", "")))
+        else:
+            documents.append((name, file.read().decode("utf-8", errors="ignore")))
+    return documents
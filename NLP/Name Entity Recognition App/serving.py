@@ -0,0 +1,61 @@
+import threading
+from contextlib import contextmanager
+
+
+class QueueFull(Exception):
+    """Raised when a request cannot be admitted; the app answers 503."""
+
+
+class RequestQueue:
+    """
+    Bounded pool of NER slots with a bounded wait queue in front of it.
+
+    At most `workers` requests run the pipeline at once. Up to `max_waiting`
+    more wait for a free slot (for at most `timeout` seconds); anything
+    beyond that is rejected immediately instead of piling up.
+    """
+
+    def __init__(self, workers=2, max_waiting=8, timeout=10.0):
+        self.workers = workers
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.served = 0
+        self.rejected = 0
+
+    @contextmanager
+    def slot(self):
+        """Hold a worker slot for the enclosed block, or raise QueueFull."""
+        # A free slot is taken straight away; only requests that actually
+        # have to wait count against max_waiting.
+        acquired = self._slots.acquire(blocking=False)
+        if not acquired:
+            with self._lock:
+                if self.waiting >= self.max_waiting:
+                    self.rejected += 1
+                    raise QueueFull("Too many requests waiting")
+                self.waiting += 1
+            acquired = self._slots.acquire(timeout=self.timeout)
+            with self._lock:
+                self.waiting -= 1
+                if not acquired:
+                    self.rejected += 1
+            if not acquired:
+                raise QueueFull("Timed out waiting for a worker")
+        with self._lock:
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.served += 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {"workers": self.workers, "max_waiting": self.max_waiting, "active": self.active,
+                    "waiting": self.waiting, "served": self.served, "rejected": self.rejected}
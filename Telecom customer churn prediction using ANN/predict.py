@@ -0,0 +1,324 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import preprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from llm_common.latency import LatencyTracker
+
+WEIGHTS_FILE = "weights.npz"
+TFLITE_FILE = "model.tflite"
+TFLITE_QUANTIZED_FILE = "model_quant.tflite"
+BACKENDS = ("numpy", "tflite", "tflite-quantized", "keras")
+ACTIVATIONS = {"relu", "sigmoid", "linear"}
+
+
+def _load_keras_model(artifacts_dir):
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    from tensorflow import keras
+
+    return keras.models.load_model(os.path.join(artifacts_dir, preprocessing.MODEL_FILE))
+
+
+def export_weights(artifacts_dir=preprocessing.DEFAULT_ARTIFACTS):
+    """
+    Save the Dense layers of model.keras as plain numpy arrays (weights.npz).
+
+    The numpy backend scores with these, so serving does not need to
+    import TensorFlow (about 2s) or go through Keras for every call.
+
+    Returns:
+        str: Path of the written file.
+    """
+    model = _load_keras_model(artifacts_dir)
+    arrays, activations = {}, []
+    for i, layer in enumerate(model.layers):
+        activation = layer.get_config().get("activation")
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Layer {layer.name} ({type(layer).__name__}) cannot be exported to numpy")
+        arrays[f"kernel_{i}"], arrays[f"bias_{i}"] = layer.get_weights()
+        activations.append(activation)
+    path = os.path.join(artifacts_dir, WEIGHTS_FILE)
+    np.savez(path, activations=np.array(activations), **arrays)
+    return path
+
+
+def export_tflite(artifacts_dir=preprocessing.DEFAULT_ARTIFACTS, quantize=False):
+    """
+    Convert model.keras to TensorFlow Lite for CPU inference.
+
+    With quantize=True, dynamic-range quantization stores the weights as
+    int8. That only applies to large weight tensors, so for the small churn
+    model the file and its speed barely change. The float model is the
+    one to use here.
+
+    Returns:
+        str: Path of the written .tflite file.
+    """
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(_load_keras_model(artifacts_dir))
+    if quantize:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    path = os.path.join(artifacts_dir, TFLITE_QUANTIZED_FILE if quantize else TFLITE_FILE)
+    with open(path, "wb") as f:
+        f.write(converter.convert())
+    return path
+
+
+def _stale(path, source):
+    return not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(source)
+
+
+def _make_interpreter(path):
+    # LiteRT is the standalone TFLite runtime; fall back to the copy in TF.
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+
+        Interpreter = tf.lite.Interpreter
+    interpreter = Interpreter(model_path=path)
+    interpreter.allocate_tensors()
+    return interpreter
+
+
+class ChurnScorer:
+    """
+    Churn model and preprocessor, loaded once and reused for every request.
+
+    Backends:
+
+    - numpy (default): the Dense layers' weights as numpy arrays. It gives the
+      same probabilities as Keras (within float32 rounding) and needs
+      no TensorFlow at serving time.
+    - tflite / tflite-quantized: the TensorFlow Lite interpreter.
+    - keras: the saved Keras model called directly, for comparison.
+
+    Missing or outdated weights.npz / .tflite files are exported from
+    model.keras on first load.
+    """
+
+    def __init__(self, artifacts_dir=preprocessing.DEFAULT_ARTIFACTS, backend="numpy", threshold=0.5):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+        self.backend = backend
+        self.threshold = threshold
+        self.preprocessor = preprocessing.ChurnPreprocessor.load(
+            os.path.join(artifacts_dir, preprocessing.PREPROCESSOR_FILE))
+        model_path = os.path.join(artifacts_dir, preprocessing.MODEL_FILE)
+
+        if backend == "numpy":
+            path = os.path.join(artifacts_dir, WEIGHTS_FILE)
+            if _stale(path, model_path):
+                export_weights(artifacts_dir)
+            with np.load(path) as weights:
+                self._layers = [(weights[f"kernel_{i}"], weights[f"bias_{i}"], activation)
+                                for i, activation in enumerate(weights["activations"])]
+        elif backend.startswith("tflite"):
+            quantize = backend == "tflite-quantized"
+            path = os.path.join(artifacts_dir, TFLITE_QUANTIZED_FILE if quantize else TFLITE_FILE)
+            if _stale(path, model_path):
+                export_tflite(artifacts_dir, quantize)
+            self._interpreter = _make_interpreter(path)
+            self._input = self._interpreter.get_input_details()[0]["index"]
+            self._output = self._interpreter.get_output_details()[0]["index"]
+            self._input_shape = tuple(self._interpreter.get_input_details()[0]["shape"])
+            # The interpreter holds one set of tensors, so calls are serialized.
+            self._interpreter_lock = threading.Lock()
+        else:
+            self._model = _load_keras_model(artifacts_dir)
+
+    def predict(self, features):
+        """
+        Churn probabilities for a preprocessed feature matrix.
+
+        Args:
+            features (numpy.ndarray): float32 array of shape (rows, features).
+
+        Returns:
+            numpy.ndarray: Probabilities, shape (rows,).
+        """
+        if self.backend == "numpy":
+            x = features
+            for kernel, bias, activation in self._layers:
+                x = x @ kernel
+                x += bias
+                if activation == "relu":
+                    np.maximum(x, 0, out=x)
+                elif activation == "sigmoid":
+                    x = 1 / (1 + np.exp(-x))
+            return x[:, 0]
+        if self.backend == "keras":
+            return self._model(features, training=False).numpy()[:, 0]
+        with self._interpreter_lock:
+            if features.shape != self._input_shape:
+                self._interpreter.resize_tensor_input(self._input, features.shape)
+                self._interpreter.allocate_tensors()
+                self._input_shape = features.shape
+            self._interpreter.set_tensor(self._input, features)
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(self._output)[:, 0].copy()
+
+    def score_record(self, record):
+        """
+        Churn probability of one customer.
+
+        Args:
+            record (dict): Raw column values, as in a row of customer_churn.csv.
+
+        Returns:
+            float: Probability that the customer churns.
+        """
+        return float(self.predict(self.preprocessor.transform_record(record))[0])
+
+    def score_frame(self, df):
+        """Churn probabilities for a DataFrame of raw rows (blank TotalCharges count as 0)."""
+        return self.predict(self.preprocessor.transform(preprocessing.clean_frame(df, drop_missing=False)))
+
+    def score_csv(self, source, output_path, chunksize=100_000):
+        """
+        Score a CSV of customers, streaming it in chunks.
+
+        Each chunk is read, encoded and scored as one batch. Its customerID,
+        churn_probability and churn (0/1 at the threshold) are appended to
+        output_path before the next chunk is read, so memory depends on
+        chunksize, not on the file size. A .parquet output path is written
+        with pyarrow, one row group per chunk; anything else is CSV.
+
+        Returns:
+            dict: rows scored and seconds taken.
+        """
+        start = time.perf_counter()
+        rows = 0
+        writer = None
+        parquet = output_path.endswith(".parquet")
+        out = None if parquet else open(output_path, "w", encoding="utf-8", newline="")
+        try:
+            for chunk in preprocessing.load_frame(source, chunksize=chunksize):
+                probability = self.score_frame(chunk)
+                result = pd.DataFrame({
+                    preprocessing.ID_COLUMN: chunk[preprocessing.ID_COLUMN].to_numpy(),
+                    "churn_probability": probability,
+                    "churn": (probability > self.threshold).astype(np.int8),
+                })
+                if parquet:
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+
+                    table = pa.Table.from_pandas(result, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(output_path, table.schema)
+                    writer.write_table(table)
+                else:
+                    result.to_csv(out, header=rows == 0, index=False, float_format="%.6f")
+                rows += len(result)
+        finally:
+            if writer is not None:
+                writer.close()
+            if out is not None:
+                out.close()
+        return {"rows": rows, "seconds": time.perf_counter() - start}
+
+
+def _format_latency(title, tracker):
+    # LatencyTracker.report() prints milliseconds; single records take microseconds.
+    s = tracker.summary()
+    return (f"{title} mean={s['mean'] * 1e6:.1f}us p50={s['p50'] * 1e6:.1f}us "
+            f"p99={s['p99'] * 1e6:.1f}us max={s['max'] * 1e6:.1f}us")
+
+
+def benchmark(artifacts_dir, csv_path, backends, upsample=(1, 100), requests=2000, chunksize=100_000):
+    """
+    Batch throughput and single-record latency of each backend.
+
+    Prints rows/second of score_csv() at each dataset size and the latency
+    percentiles of score_record() over records taken from the CSV. It also
+    times the path a notebook would take for one customer (a one-row
+    DataFrame and model.predict()) as the baseline.
+    """
+    raw = pd.read_csv(csv_path)
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        records = list(csv.DictReader(f))
+    records = [records[i % len(records)] for i in range(requests)]
+
+    scorers = {}
+    for backend in backends:
+        start = time.perf_counter()
+        scorers[backend] = ChurnScorer(artifacts_dir, backend)
+        print(f"{backend}: loaded in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    output = os.path.join(tempfile.gettempdir(), "churn_scores.csv")
+    for factor in upsample:
+        path = csv_path
+        if factor > 1:
+            path = os.path.join(tempfile.gettempdir(), f"customer_churn_x{factor}.csv")
+            preprocessing.upsample(raw, factor).to_csv(path, index=False)
+        print(f"Batch scoring, {len(raw) * factor} rows ({factor}x), chunks of {chunksize}:")
+        for backend, scorer in scorers.items():
+            result = scorer.score_csv(path, output, chunksize)
+            print(f"  {backend:18s} {result['seconds'] * 1000:9.1f}ms  {result['rows'] / result['seconds']:10.0f} rows/s")
+        if path != csv_path:
+            os.remove(path)
+    os.remove(output)
+
+    print(f"Single record, {requests} requests:")
+    for backend, scorer in scorers.items():
+        tracker = LatencyTracker()
+        for record in records:
+            with tracker.measure():
+                scorer.score_record(record)
+        print("  " + _format_latency(f"{backend:18s}", tracker))
+
+    model = _load_keras_model(artifacts_dir)
+    preprocessor = scorers[backends[0]].preprocessor
+    tracker = LatencyTracker()
+    for record in records[:100]:
+        with tracker.measure():
+            frame = preprocessing.clean_frame(pd.DataFrame([record]), drop_missing=False)
+            model.predict(preprocessor.transform(frame), verbose=0)
+    print("  " + _format_latency(f"{'notebook-style':18s}", tracker) + "  (DataFrame + model.predict)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score customers with the trained churn model.")
+    parser.add_argument("source", nargs="?", help="CSV of customers to score")
+    parser.add_argument("-o", "--output", default="churn_scores.csv", help="Output .csv or .parquet file")
+    parser.add_argument("--artifacts", default=preprocessing.DEFAULT_ARTIFACTS, help="Directory written by train.py")
+    parser.add_argument("--backend", choices=BACKENDS, default="numpy", help="Inference backend")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Rows per streamed batch")
+    parser.add_argument("--record", help="Score one customer given as a JSON object")
+    parser.add_argument("--export-tflite", action="store_true", help="Write model.tflite and model_quant.tflite")
+    parser.add_argument("--benchmark", action="store_true", help="Measure throughput and single-record latency")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=["numpy", "tflite", "keras"],
+                        help="Backends to benchmark")
+    parser.add_argument("--upsample", type=int, nargs="+", default=[1, 100], help="Dataset sizes to benchmark")
+    parser.add_argument("-n", "--requests", type=int, default=2000, help="Single-record requests to benchmark")
+    args = parser.parse_args()
+
+    if args.export_tflite:
+        for quantize in (False, True):
+            path = export_tflite(args.artifacts, quantize)
+            print(f"Wrote {path} ({os.path.getsize(path)} bytes)")
+    elif args.benchmark:
+        benchmark(args.artifacts, args.source or preprocessing.DEFAULT_CSV, args.backends, args.upsample,
+                  args.requests, args.chunksize)
+    elif args.record:
+        scorer = ChurnScorer(args.artifacts, args.backend)
+        probability = scorer.score_record(json.loads(args.record))
+        print(json.dumps({"churn_probability": round(probability, 6), "churn": int(probability > scorer.threshold)}))
+    elif args.source:
+        result = ChurnScorer(args.artifacts, args.backend).score_csv(args.source, args.output, args.chunksize)
+        print(f"Scored {result['rows']} customers in {result['seconds']:.2f}s "
+              f"({result['rows'] / result['seconds']:.0f} rows/s) -> {args.output}")
+    else:
+        parser.error("give a CSV to score, --record, --export-tflite or --benchmark")
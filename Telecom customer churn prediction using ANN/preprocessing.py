@@ -0,0 +1,279 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ID_COLUMN = "customerID"
+TARGET = "Churn"
+# Columns passed through as 0/1 or scaled values, in the notebooks' order.
+BASE_FEATURES = ["gender", "SeniorCitizen", "Partner", "Dependents", "tenure", "PhoneService", "MultipleLines",
+                 "OnlineSecurity", "OnlineBackup", "DeviceProtection", "TechSupport", "StreamingTV",
+                 "StreamingMovies", "PaperlessBilling", "MonthlyCharges", "TotalCharges"]
+# "No internet service" / "No phone service" count as "No", so comparing
+# with "Yes" gives the notebooks' 1/0 encoding directly.
+YES_NO_COLUMNS = ["Partner", "Dependents", "PhoneService", "MultipleLines", "OnlineSecurity", "OnlineBackup",
+                  "DeviceProtection", "TechSupport", "StreamingTV", "StreamingMovies", "PaperlessBilling"]
+ONE_HOT_COLUMNS = ["InternetService", "Contract", "PaymentMethod"]
+SCALED_COLUMNS = ["tenure", "MonthlyCharges", "TotalCharges"]
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV = os.path.join(APP_DIR, "customer_churn.csv")
+# Files written by train.py and read by predict.py.
+DEFAULT_ARTIFACTS = os.path.join(APP_DIR, "artifacts")
+MODEL_FILE = "model.keras"
+PREPROCESSOR_FILE = "preprocessor.json"
+
+
+# Text columns are parsed straight into pandas categoricals: every later
+# comparison is then on small integer codes instead of Python strings.
+CATEGORICAL_COLUMNS = ["gender"] + YES_NO_COLUMNS + ONE_HOT_COLUMNS + [TARGET]
+CSV_OPTIONS = {
+    "dtype": {column: "category" for column in CATEGORICAL_COLUMNS} | {ID_COLUMN: str},
+    # Blank TotalCharges become NaN while parsing, so the column is float.
+    "na_values": {"TotalCharges": [" "]},
+}
+
+
+def load_frame(source=DEFAULT_CSV, **read_csv_kwargs):
+    """
+    Read the raw churn CSV (a path or file object).
+
+    Text columns are read as categoricals and TotalCharges as floats (NaN
+    where blank). Extra keyword arguments go to pandas.read_csv, e.g.
+    chunksize to stream a large file.
+    """
+    return pd.read_csv(source, **{**CSV_OPTIONS, **read_csv_kwargs})
+
+
+def clean_frame(df, drop_missing=True):
+    """
+    Convert TotalCharges to numbers.
+
+    Eleven customers in the training data have a blank TotalCharges (all
+    with tenure 0). The notebooks drop them, which drop_missing=True does
+    too; for scoring, drop_missing=False keeps them with TotalCharges 0.
+
+    Args:
+        df (pandas.DataFrame): Raw churn data.
+        drop_missing (bool): Drop rows without TotalCharges instead of
+            filling them with 0.
+
+    Returns:
+        pandas.DataFrame: The data with a float TotalCharges column.
+    """
+    total = pd.to_numeric(df["TotalCharges"], errors="coerce")
+    if drop_missing:
+        keep = total.notna().to_numpy()
+        return df[keep].assign(TotalCharges=total[keep])
+    return df.assign(TotalCharges=total.fillna(0.0))
+
+
+def _equals(series, value):
+    # Boolean array of series == value, comparing category codes when the
+    # column is categorical.
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        if value not in categories:
+            return np.zeros(len(series), dtype=bool)
+        return series.cat.codes.to_numpy() == categories.get_loc(value)
+    return series.to_numpy() == value
+
+
+def target(df):
+    """Churn labels as a float32 array of 1 (Yes) and 0 (No)."""
+    return _equals(df[TARGET], "Yes").astype(np.float32)
+
+
+class ChurnPreprocessor:
+    """
+    The notebooks' feature engineering, fitted once and saved as JSON.
+
+    Yes/No columns become 1/0, gender becomes 1 for Female, InternetService,
+    Contract and PaymentMethod are one-hot encoded with the categories seen
+    during fit (sorted, like pd.get_dummies), and tenure, MonthlyCharges
+    and TotalCharges are min-max scaled with the training minimum and
+    maximum. transform() works on whole columns with numpy and writes
+    straight into one float32 matrix, with the 26 features in the same
+    order as the notebooks' X. Unknown categories get all-zero one-hot
+    columns.
+    """
+
+    def __init__(self, categories=None, minimum=None, maximum=None):
+        self.categories = categories or {}
+        self.minimum = minimum or {}
+        self.maximum = maximum or {}
+        self._index_categories()
+
+    def _index_categories(self):
+        # Feature position of every one-hot category, for transform_record().
+        self._one_hot_positions, offset = {}, len(BASE_FEATURES)
+        for column, values in self.categories.items():
+            self._one_hot_positions[column] = {value: offset + i for i, value in enumerate(values)}
+            offset += len(values)
+        self._width = offset
+
+    @property
+    def feature_names(self):
+        return BASE_FEATURES + [f"{column}_{value}" for column in ONE_HOT_COLUMNS
+                                for value in self.categories[column]]
+
+    def fit(self, df):
+        """
+        Learn the categories and scaling ranges from cleaned training data.
+
+        Returns:
+            ChurnPreprocessor: self.
+        """
+        self.categories = {column: sorted(map(str, df[column].dropna().unique())) for column in ONE_HOT_COLUMNS}
+        self.minimum = {column: float(df[column].min()) for column in SCALED_COLUMNS}
+        self.maximum = {column: float(df[column].max()) for column in SCALED_COLUMNS}
+        self._index_categories()
+        return self
+
+    def transform(self, df):
+        """
+        Turn cleaned churn data into the model's input matrix.
+
+        Args:
+            df (pandas.DataFrame): Rows with the raw columns (TotalCharges
+                already numeric, see clean_frame); extra columns such as
+                customerID and Churn are ignored.
+
+        Returns:
+            numpy.ndarray: float32 array of shape (rows, features).
+        """
+        if not self.categories:
+            raise ValueError("ChurnPreprocessor is not fitted")
+        features = np.zeros((len(df), self._width), dtype=np.float32)
+        position = {name: i for i, name in enumerate(BASE_FEATURES)}
+
+        features[:, position["gender"]] = _equals(df["gender"], "Female")
+        features[:, position["SeniorCitizen"]] = df["SeniorCitizen"].to_numpy()
+        for column in YES_NO_COLUMNS:
+            features[:, position[column]] = _equals(df[column], "Yes")
+        for column in SCALED_COLUMNS:
+            low, high = self.minimum[column], self.maximum[column]
+            features[:, position[column]] = (df[column].to_numpy(dtype=np.float64) - low) / ((high - low) or 1.0)
+
+        offset = len(BASE_FEATURES)
+        rows = np.arange(len(df))
+        for column in ONE_HOT_COLUMNS:
+            codes = pd.Categorical(df[column], categories=self.categories[column]).codes
+            known = codes >= 0
+            features[rows[known], offset + codes[known]] = 1.0
+            offset += len(self.categories[column])
+        return features
+
+    def transform_record(self, record):
+        """
+        Turn one customer into a feature vector without building a DataFrame.
+
+        Same result as transform() on a one-row frame, for low-latency
+        scoring of single requests.
+
+        Args:
+            record (dict): Raw column values of one customer, as strings or
+                numbers (a blank TotalCharges counts as 0).
+
+        Returns:
+            numpy.ndarray: float32 array of shape (1, features).
+        """
+        if not self.categories:
+            raise ValueError("ChurnPreprocessor is not fitted")
+        values = [0.0] * self._width
+        values[0] = float(record["gender"] == "Female")
+        values[1] = float(record["SeniorCitizen"])
+        for i, column in enumerate(BASE_FEATURES[2:], 2):
+            if column in SCALED_COLUMNS:
+                raw = record[column]
+                number = float(raw) if str(raw).strip() else 0.0
+                low, high = self.minimum[column], self.maximum[column]
+                values[i] = (number - low) / ((high - low) or 1.0)
+            else:
+                values[i] = float(record[column] == "Yes")
+        for column, positions in self._one_hot_positions.items():
+            position = positions.get(record[column])
+            if position is not None:
+                values[position] = 1.0
+        return np.array([values], dtype=np.float32)
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"categories": self.categories, "minimum": self.minimum, "maximum": self.maximum,
+                       "features": self.feature_names}, f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        return cls(state["categories"], state["minimum"], state["maximum"])
+
+
+def upsample(df, factor, seed=0):
+    """
+    Synthetic larger dataset: rows drawn with replacement, new customer ids.
+
+    Used to measure preprocessing and training at scale; the values are
+    those of the original customers.
+    """
+    sample = df.sample(n=len(df) * factor, replace=True, random_state=seed).reset_index(drop=True)
+    sample[ID_COLUMN] = [f"SYN-{i:08d}" for i in range(len(sample))]
+    return sample
+
+
+def _notebook_features(df):
+    # The notebooks' pandas steps, kept as the benchmark baseline.
+    df1 = df.drop(ID_COLUMN, axis=1)
+    df1 = df1[df1.TotalCharges != " "].copy()
+    df1.TotalCharges = pd.to_numeric(df1.TotalCharges)
+    df1 = df1.replace("No internet service", "No").replace("No phone service", "No")
+    for column in YES_NO_COLUMNS + [TARGET]:
+        df1[column] = df1[column].replace({"Yes": 1, "No": 0}).astype(int)
+    df1["gender"] = df1["gender"].replace({"Female": 1, "Male": 0}).astype(int)
+    df2 = pd.get_dummies(data=df1, columns=ONE_HOT_COLUMNS, dtype="int")
+    for column in SCALED_COLUMNS:
+        df2[column] = (df2[column] - df2[column].min()) / (df2[column].max() - df2[column].min())
+    return df2.drop(TARGET, axis=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark churn preprocessing against the notebook steps.")
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="Raw churn CSV")
+    parser.add_argument("--upsample", type=int, nargs="+", default=[1, 100], help="Dataset sizes to try")
+    args = parser.parse_args()
+
+    raw = pd.read_csv(args.csv)
+    for factor in args.upsample:
+        # Both paths start from a CSV file, so parsing is part of the time.
+        path = args.csv
+        if factor > 1:
+            path = os.path.join(tempfile.gettempdir(), f"customer_churn_x{factor}.csv")
+            upsample(raw, factor).to_csv(path, index=False)
+
+        start = time.perf_counter()
+        expected = _notebook_features(pd.read_csv(path))
+        notebook_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cleaned = clean_frame(load_frame(path))
+        preprocessor = ChurnPreprocessor().fit(cleaned)
+        features = preprocessor.transform(cleaned)
+        labels = target(cleaned)
+        seconds = time.perf_counter() - start
+
+        assert list(expected.columns) == preprocessor.feature_names, "feature order differs"
+        assert np.allclose(expected.to_numpy(dtype=np.float64), features, atol=1e-6), "features differ"
+        print(f"{len(features)} rows ({factor}x), {features.shape[1]} features, identical to the notebook steps")
+        for name, elapsed in [("notebook (read_csv, replace, get_dummies)", notebook_seconds),
+                              ("load_frame + ChurnPreprocessor", seconds)]:
+            print(f"  {name:42s} {elapsed * 1000:9.1f}ms  {len(features) / elapsed:10.0f} rows/s  "
+                  f"{notebook_seconds / elapsed:5.1f}x")
+        if path != args.csv:
+            os.remove(path)
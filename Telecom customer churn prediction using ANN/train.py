@@ -0,0 +1,226 @@
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+from sklearn.metrics import classification_report
+from sklearn.model_selection import train_test_split
+
+import preprocessing
+
+METRICS_FILE = "metrics.json"
+
+
+def configure_threads(intra_op=None, inter_op=None):
+    """
+    Set TensorFlow's CPU thread pools; must run before the first TF op.
+
+    intra_op threads split a single op (a matrix multiply) and inter_op
+    threads run independent ops in parallel. The churn model is a few
+    small dense layers, so by default intra_op uses every core and inter_op
+    stays at 2. CHURN_INTRA_OP_THREADS and CHURN_INTER_OP_THREADS override
+    the defaults; 0 lets TensorFlow decide.
+    """
+    intra_op = intra_op if intra_op is not None else int(os.getenv("CHURN_INTRA_OP_THREADS", os.cpu_count() or 1))
+    inter_op = inter_op if inter_op is not None else int(os.getenv("CHURN_INTER_OP_THREADS", "2"))
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+    return intra_op, inter_op
+
+
+def make_dataset(features, labels, batch_size=32, shuffle=True, seed=5):
+    """
+    tf.data pipeline over in-memory arrays.
+
+    Row indices are shuffled and batched, and each batch is gathered from
+    the feature matrix in one vectorized op, which is much cheaper than
+    shuffling and batching individual rows. The next batches are prepared
+    while the current one trains (prefetch).
+
+    Args:
+        features (numpy.ndarray): float32 matrix from ChurnPreprocessor.
+        labels (numpy.ndarray): float32 0/1 labels.
+        batch_size (int): Rows per training step.
+        shuffle (bool): Reshuffle the rows every epoch.
+        seed (int): Shuffle seed.
+
+    Returns:
+        tf.data.Dataset: (features, labels) batches.
+    """
+    features = tf.constant(features)
+    labels = tf.constant(labels)
+    dataset = tf.data.Dataset.range(len(labels))
+    if shuffle:
+        dataset = dataset.shuffle(len(labels), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size).map(lambda rows: (tf.gather(features, rows), tf.gather(labels, rows)),
+                                            num_parallel_calls=tf.data.AUTOTUNE)
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+
+def build_model(n_features, hidden=(20,), steps_per_execution=32):
+    """
+    The notebooks' ANN: ReLU hidden layers and a sigmoid output.
+
+    hidden=(20,) is Customer_churn_ANN.ipynb, (26, 15) the balanced
+    notebook's model. The model is so small that a training step costs
+    less than dispatching it from Python, so steps_per_execution runs
+    several batches per call into the compiled graph (same updates, same
+    results).
+    """
+    model = keras.Sequential([keras.Input(shape=(n_features,))]
+                             + [keras.layers.Dense(units, activation="relu") for units in hidden]
+                             + [keras.layers.Dense(1, activation="sigmoid")])
+    model.compile(optimizer="adam", loss="binary_crossentropy", metrics=["accuracy"],
+                  steps_per_execution=steps_per_execution)
+    return model
+
+
+class EpochTimer(keras.callbacks.Callback):
+    """Records the wall time of every epoch."""
+
+    def __init__(self):
+        super().__init__()
+        self.seconds = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.seconds.append(time.perf_counter() - self._start)
+
+    def epochs_per_second(self):
+        # The first epoch includes tracing the training step, so it is left
+        # out when there are others.
+        steady = self.seconds[1:] or self.seconds
+        return len(steady) / sum(steady) if steady else 0.0
+
+
+def prepare_data(csv_path=preprocessing.DEFAULT_CSV, upsample=1, test_size=0.2, seed=5):
+    """
+    Load the CSV, split it like the notebooks and fit the preprocessor.
+
+    The preprocessor is fitted on the training rows only, so the test rows
+    are scaled with ranges the model could have seen in production.
+
+    Returns:
+        dict: preprocessor, x_train, y_train, x_test, y_test and seconds
+        (end-to-end preprocessing time, including reading the CSV).
+    """
+    start = time.perf_counter()
+    frame = preprocessing.load_frame(csv_path)
+    if upsample > 1:
+        frame = preprocessing.upsample(frame, upsample, seed)
+    frame = preprocessing.clean_frame(frame)
+    train_rows, test_rows = train_test_split(np.arange(len(frame)), test_size=test_size, random_state=seed)
+    preprocessor = preprocessing.ChurnPreprocessor().fit(frame.iloc[train_rows])
+    features = preprocessor.transform(frame)
+    labels = preprocessing.target(frame)
+    return {
+        "preprocessor": preprocessor,
+        "x_train": features[train_rows], "y_train": labels[train_rows],
+        "x_test": features[test_rows], "y_test": labels[test_rows],
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def train(csv_path=preprocessing.DEFAULT_CSV, output_dir=preprocessing.DEFAULT_ARTIFACTS, epochs=100, batch_size=32,
+          hidden=(20,), upsample=1, seed=5, steps_per_execution=32, verbose=0):
+    """
+    Train the churn ANN and save the model, preprocessor and metrics.
+
+    Args:
+        csv_path (str): Raw churn CSV.
+        output_dir (str): Directory for model.keras, preprocessor.json and
+            metrics.json.
+        epochs (int): Training epochs.
+        batch_size (int): Rows per training step.
+        hidden (tuple): Units of each hidden layer.
+        upsample (int): Train on a synthetic dataset this many times larger.
+        seed (int): Split, shuffle and weight-initialisation seed.
+        steps_per_execution (int): Batches per compiled training call.
+        verbose (int): Keras progress output.
+
+    Returns:
+        dict: The metrics written to metrics.json.
+    """
+    keras.utils.set_random_seed(seed)
+    data = prepare_data(csv_path, upsample, seed=seed)
+    model = build_model(data["x_train"].shape[1], hidden, steps_per_execution)
+    timer = EpochTimer()
+    start = time.perf_counter()
+    # The dataset reshuffles itself every epoch.
+    model.fit(make_dataset(data["x_train"], data["y_train"], batch_size, seed=seed),
+              epochs=epochs, callbacks=[timer], verbose=verbose, shuffle=False)
+    train_seconds = time.perf_counter() - start
+
+    test = make_dataset(data["x_test"], data["y_test"], batch_size=1024, shuffle=False)
+    loss, accuracy = model.evaluate(test, verbose=0)
+    predicted = (model.predict(test, verbose=0)[:, 0] > 0.5).astype(np.float32)
+
+    os.makedirs(output_dir, exist_ok=True)
+    model.save(os.path.join(output_dir, preprocessing.MODEL_FILE))
+    data["preprocessor"].save(os.path.join(output_dir, preprocessing.PREPROCESSOR_FILE))
+    metrics = {
+        "rows": len(data["y_train"]) + len(data["y_test"]),
+        "features": data["x_train"].shape[1],
+        "hidden": list(hidden),
+        "epochs": epochs,
+        "batch_size": batch_size,
+        "steps_per_execution": steps_per_execution,
+        "preprocess_seconds": data["seconds"],
+        "train_seconds": train_seconds,
+        "epochs_per_second": timer.epochs_per_second(),
+        "samples_per_second": timer.epochs_per_second() * len(data["y_train"]),
+        "test_loss": float(loss),
+        "test_accuracy": float(accuracy),
+        "report": classification_report(data["y_test"], predicted, output_dict=True, zero_division=0),
+    }
+    with open(os.path.join(output_dir, METRICS_FILE), "w", encoding="utf-8") as f:
+        json.dump(metrics, f, indent=2)
+    return metrics
+
+
+def baseline_epochs_per_second(csv_path=preprocessing.DEFAULT_CSV, epochs=5, batch_size=32, hidden=(20,),
+                               upsample=1, seed=5):
+    """Epochs/second of the notebooks' model.fit(X_train, y_train) on in-memory arrays, one step per call."""
+    keras.utils.set_random_seed(seed)
+    data = prepare_data(csv_path, upsample, seed=seed)
+    model = build_model(data["x_train"].shape[1], hidden, steps_per_execution=1)
+    timer = EpochTimer()
+    model.fit(data["x_train"], data["y_train"], epochs=epochs, batch_size=batch_size, callbacks=[timer], verbose=0)
+    return timer.epochs_per_second()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the telecom churn ANN.")
+    parser.add_argument("--csv", default=preprocessing.DEFAULT_CSV, help="Raw churn CSV")
+    parser.add_argument("-o", "--output", default=preprocessing.DEFAULT_ARTIFACTS,
+                        help="Directory for the saved artifacts")
+    parser.add_argument("--epochs", type=int, default=100, help="Training epochs")
+    parser.add_argument("--batch-size", type=int, default=32, help="Rows per training step")
+    parser.add_argument("--hidden", type=int, nargs="+", default=[20], help="Hidden layer sizes, e.g. 26 15")
+    parser.add_argument("--upsample", type=int, default=1, help="Train on synthetic data N times larger")
+    parser.add_argument("--steps-per-execution", type=int, default=32, help="Batches per compiled training call")
+    parser.add_argument("--threads", type=int, help="Intra-op threads (default: CPU count)")
+    parser.add_argument("--baseline", action="store_true",
+                        help="Also time model.fit on in-memory arrays, as in the notebooks")
+    args = parser.parse_args()
+
+    intra_op, inter_op = configure_threads(args.threads)
+    metrics = train(args.csv, args.output, args.epochs, args.batch_size, tuple(args.hidden), args.upsample,
+                    steps_per_execution=args.steps_per_execution, verbose=2)
+    print(f"Preprocessing: {metrics['rows']} rows in {metrics['preprocess_seconds'] * 1000:.0f}ms")
+    print(f"Training: {metrics['epochs_per_second']:.2f} epochs/s ({metrics['samples_per_second']:.0f} samples/s, "
+          f"batch {args.batch_size}, {args.steps_per_execution} steps per call, "
+          f"{intra_op} intra-op / {inter_op} inter-op threads)")
+    print(f"Test accuracy: {metrics['test_accuracy']:.3f}")
+    if args.baseline:
+        baseline = baseline_epochs_per_second(args.csv, min(args.epochs, 5), args.batch_size, tuple(args.hidden),
+                                              args.upsample)
+        print(f"Notebook-style fit on arrays: {baseline:.2f} epochs/s")
+    print(f"Saved {preprocessing.MODEL_FILE}, {preprocessing.PREPROCESSOR_FILE} and {METRICS_FILE} to {args.output}")
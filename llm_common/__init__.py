@@ -0,0 +1,8 @@
+"""
+Helpers shared by the LLM-based projects in this repository (news brief
+generator, study assistant, smart office assistant, financial data
+extraction tool).
+
+The project folders are plain script directories, so each script adds the
+repository root to sys.path before importing from here.
+"""
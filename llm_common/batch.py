@@ -0,0 +1,81 @@
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def load_processed_ids(output_path):
+    """
+    Read the ids already written successfully to a JSONL output file, so a
+    restarted run can skip them. Failed items are retried.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by an interrupted run.
+                continue
+            if "error" not in record:
+                done.add(record["id"])
+    return done
+
+
+def run_resumable(items, process, output_path, max_workers=8):
+    """
+    Process items concurrently and append one JSON record per item to a
+    JSONL file.
+
+    Records are written and flushed as soon as each item finishes, so an
+    interrupted run loses at most the items in flight; re-running with the
+    same output file skips the ids already written successfully. Items are
+    pulled from the iterable lazily, with at most 2 * max_workers in flight.
+    A failed item is written as {"id": ..., "error": ...}.
+
+    Args:
+        items (iterable): (item_id, item) pairs.
+        process (callable): process(item_id, item) -> dict record with an
+            "id" key; called in worker threads.
+        output_path (str): JSONL file to append records to.
+        max_workers (int): Maximum number of items processed concurrently.
+
+    Returns:
+        dict: Counts of processed, skipped and failed items and elapsed
+        seconds.
+    """
+    done = load_processed_ids(output_path)
+    counts = {"processed": 0, "skipped": 0, "failed": 0}
+    start = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {}
+
+        def write_finished():
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                item_id = pending.pop(future)
+                try:
+                    record = future.result()
+                    counts["processed"] += 1
+                except Exception as e:
+                    record = {"id": item_id, "error": str(e)}
+                    counts["failed"] += 1
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+
+        for item_id, item in items:
+            if item_id in done:
+                counts["skipped"] += 1
+                continue
+            while len(pending) >= 2 * max_workers:
+                write_finished()
+            pending[pool.submit(process, item_id, item)] = item_id
+        while pending:
+            write_finished()
+
+    counts["elapsed"] = time.perf_counter() - start
+    return counts
@@ -0,0 +1,299 @@
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "deep-learning-llm", "responses.sqlite3")
+
+
+def cache_key(model, messages, temperature=None, max_tokens=None, **params):
+    """
+    Content hash identifying a chat completion request.
+
+    Args:
+        model (str): Model name.
+        messages (list): Chat messages.
+        temperature (float): Sampling temperature.
+        max_tokens (int): Completion token limit.
+        **params: Any other request parameters that change the output.
+
+    Returns:
+        str: Hex SHA-256 of the canonical JSON form of the request.
+    """
+    payload = {"model": model, "messages": messages, "temperature": temperature,
+               "max_tokens": max_tokens, **params}
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache of LLM responses: an in-memory LRU in front of an
+    optional SQLite file.
+
+    Disk entries expire after ttl seconds, and the least recently used
+    entries are evicted once the file holds more than max_disk_bytes of
+    responses. With a SQLite file the hit/miss counters are stored in it
+    too, so stats() reports the totals of every process that used the file.
+    """
+
+    def __init__(self, path=None, max_memory_entries=1024, ttl=7 * 24 * 3600,
+                 max_disk_bytes=256 * 1024 * 1024):
+        """
+        Args:
+            path (str, optional): SQLite file for the persistent tier; None
+                keeps the cache in memory only.
+            max_memory_entries (int): Size of the in-memory LRU.
+            ttl (float): Seconds before an entry expires (None: never).
+            max_disk_bytes (int): Size limit of the stored responses.
+        """
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        # Counter increments not yet added to the SQLite totals.
+        self._unsaved = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, "
+                "accessed REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._disk_bytes = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            atexit.register(self.save_counters)
+
+    def _count(self, name):
+        setattr(self, name, getattr(self, name) + 1)
+        self._unsaved[name] += 1
+
+    def _save_counters(self):
+        # Increments are added to the stored totals with the next write the
+        # cache makes anyway, rather than one write per memory hit.
+        if self._db is None or not any(self._unsaved.values()):
+            return
+        self._db.executemany(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+            [(name, count) for name, count in self._unsaved.items() if count])
+        self._unsaved = dict.fromkeys(self._unsaved, 0)
+
+    def save_counters(self):
+        """
+        Add the hit/miss counts not yet stored to the SQLite totals. Called
+        on every disk write and at exit.
+        """
+        with self._lock:
+            self._save_counters()
+
+    def _expired(self, created, now):
+        return self.ttl is not None and now - created > self.ttl
+
+    def _remember(self, key, value, created):
+        self.memory[key] = (value, created)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        Look up a response.
+
+        Returns:
+            str or None: The cached response text, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self.memory.get(key)
+            if entry is not None and not self._expired(entry[1], now):
+                self.memory.move_to_end(key)
+                self._count("memory_hits")
+                return entry[0]
+            self.memory.pop(key, None)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and not self._expired(row[1], now):
+                    self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                    self._remember(key, row[0], row[1])
+                    self._count("disk_hits")
+                    self._save_counters()
+                    return row[0]
+                if row is not None:
+                    self._delete(key)
+            self._count("misses")
+            return None
+
+    def put(self, key, value):
+        """
+        Store a response in both tiers.
+        """
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._db is None:
+                return
+            size = len(value.encode("utf-8"))
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed, size) "
+                "VALUES (?, ?, ?, ?, ?)", (key, value, now, now, size))
+            self._disk_bytes += size - (old[0] if old else 0)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict(now)
+            self._save_counters()
+
+    def _delete(self, key):
+        row = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._disk_bytes -= row[0]
+
+    def _evict(self, now):
+        # Drop expired entries first, then least recently used ones until
+        # the file is back under 90% of the limit.
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        self._disk_bytes = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        target = self.max_disk_bytes * 0.9
+        for key, size in self._db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            if self._disk_bytes <= target:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._disk_bytes -= size
+
+    def clear(self):
+        """
+        Remove every entry and reset the hit/miss counters.
+        """
+        with self._lock:
+            self.memory.clear()
+            self.memory_hits = self.disk_hits = self.misses = 0
+            self._unsaved = dict.fromkeys(self._unsaved, 0)
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.execute("DELETE FROM counters")
+                self._disk_bytes = 0
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hit/miss counters, hit rate and tier sizes. With a SQLite
+            file the counters are the totals stored in it.
+        """
+        with self._lock:
+            counters = {"memory_hits": self.memory_hits, "disk_hits": self.disk_hits, "misses": self.misses}
+            if self._db is not None:
+                self._save_counters()
+                counters.update(dict.fromkeys(counters, 0))
+                counters.update(self._db.execute("SELECT name, value FROM counters").fetchall())
+            lookups = sum(counters.values())
+            stats = {
+                **counters,
+                "hit_rate": (counters["memory_hits"] + counters["disk_hits"]) / lookups if lookups else 0.0,
+                "memory_entries": len(self.memory),
+            }
+            if self._db is not None:
+                stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                stats["disk_bytes"] = self._disk_bytes
+            return stats
+
+
+class _CachedCompletions:
+    def __init__(self, client, cache):
+        self._client = client
+        self._cache = cache
+
+    def create(self, model, messages, **kwargs):
+        # Streaming responses are consumed incrementally, so they are not cached.
+        if kwargs.get("stream"):
+            return self._client.chat.completions.create(model=model, messages=messages, **kwargs)
+
+        params = dict(kwargs)
+        temperature = params.pop("temperature", None)
+        max_tokens = params.pop("max_completion_tokens", params.pop("max_tokens", None))
+        key = cache_key(model, messages, temperature, max_tokens, **params)
+        content = self._cache.get(key)
+        if content is None:
+            response = self._client.chat.completions.create(model=model, messages=messages, **kwargs)
+            content = response.choices[0].message.content if response.choices else None
+            # Tool calls and refusals can come back without text; those are
+            # returned as they are but not cached.
+            if isinstance(content, str):
+                self._cache.put(key, content)
+            return response
+
+        message = SimpleNamespace(role="assistant", content=content)
+        return SimpleNamespace(
+            model=model,
+            cached=True,
+            choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+        )
+
+
+class CachedChatClient:
+    """
+    Wrap a Groq/OpenAI client so identical chat completion requests are
+    answered from a ResponseCache instead of the API.
+
+    Only client.chat.completions.create() is intercepted; cache hits return
+    an object with the same choices[0].message.content shape.
+    """
+
+    def __init__(self, client, cache=None):
+        self.client = client
+        self.cache = cache if cache is not None else get_default_cache()
+        self.chat = SimpleNamespace(completions=_CachedCompletions(client, self.cache))
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """
+    Process-wide cache shared by all entry points.
+
+    LLM_CACHE_PATH overrides the SQLite location, LLM_CACHE_TTL the expiry
+    in seconds, and LLM_CACHE=0 disables the persistent tier.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            path = None
+            if os.getenv("LLM_CACHE", "1") != "0":
+                path = os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+            _default_cache = ResponseCache(path, ttl=float(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600)))
+        return _default_cache
+
+
+if __name__ == "__main__":
+    cache = get_default_cache()
+    if sys.argv[1:] == ["--clear"]:
+        cache.clear()
+        print(f"Cleared {cache.path}")
+    else:
+        print(json.dumps(cache.stats(), indent=2))
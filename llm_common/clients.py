@@ -0,0 +1,268 @@
+import importlib
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+from llm_common.cache import CachedChatClient
+from llm_common.latency import LatencyTracker
+
+API_KEY_ENV = {"groq": "GROQ_API_KEY", "openai": "OPENAI_API_KEY"}
+SDK_MODULES = {"groq": "groq", "openai": "openai"}
+
+
+class ClientMetrics:
+    """
+    Request, connection and retry counters for one pooled client.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.retries = 0
+        self.latency = LatencyTracker()
+
+    def count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def summary(self):
+        """
+        Returns:
+            dict: HTTP requests sent, connections opened and reused,
+            retries, and API call latency percentiles.
+        """
+        with self._lock:
+            requests, connections, retries = self.requests, self.connections, self.retries
+        return {
+            "http_requests": requests,
+            "connections_opened": connections,
+            "connections_reused": max(requests - connections, 0),
+            "retries": retries,
+            "latency": self.latency.summary(),
+        }
+
+
+def _make_http_client(metrics, max_connections=20, timeout=60.0):
+    """
+    Build a keep-alive httpx client whose connection pool is shared by all
+    requests of one API client, counting new TCP connections so reuse can
+    be measured.
+    """
+    import httpx
+
+    def trace(event_name, info):
+        if event_name == "connection.connect_tcp.complete":
+            metrics.count("connections")
+
+    def on_request(request):
+        metrics.count("requests")
+        request.extensions["trace"] = trace
+
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=max_connections,
+                            max_keepalive_connections=max_connections),
+        timeout=timeout,
+        event_hooks={"request": [on_request]},
+    )
+
+
+def is_rate_limit_error(error):
+    """
+    True for HTTP 429 errors raised by the Groq or OpenAI SDKs.
+    """
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def backoff_delay(attempt, base_delay=0.5, max_delay=30.0, error=None):
+    """
+    Seconds to wait before retry number attempt (0-based).
+
+    Uses exponential backoff with full jitter, so concurrent callers that
+    hit the rate limit together do not retry in lockstep. A Retry-After
+    header on the error, if present, is used as the minimum wait.
+    """
+    delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+    response = getattr(error, "response", None)
+    retry_after = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    try:
+        delay = max(delay, float(retry_after))
+    except (TypeError, ValueError):
+        pass
+    return delay
+
+
+def call_with_retry(fn, *args, max_attempts=5, base_delay=0.5, max_delay=30.0,
+                    should_retry=is_rate_limit_error, on_retry=None, **kwargs):
+    """
+    Call fn, retrying with exponential backoff and jitter on rate-limit errors.
+
+    Args:
+        fn (callable): Function to call.
+        max_attempts (int): Total attempts including the first.
+        base_delay (float): Backoff for the first retry, in seconds.
+        max_delay (float): Upper bound of a single backoff.
+        should_retry (callable): Decides whether an exception is retryable.
+        on_retry (callable, optional): Called with (attempt, error) before
+            each retry.
+
+    Returns:
+        The return value of fn.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if attempt == max_attempts - 1 or not should_retry(e):
+                raise
+            if on_retry is not None:
+                on_retry(attempt, e)
+            time.sleep(backoff_delay(attempt, base_delay, max_delay, e))
+
+
+class _ManagedCompletions:
+    def __init__(self, owner, max_attempts):
+        self._owner = owner
+        self._max_attempts = max_attempts
+
+    def create(self, **kwargs):
+        metrics = self._owner.metrics
+        with metrics.latency.measure(kwargs.get("model")):
+            return call_with_retry(
+                self._owner.client.chat.completions.create,
+                max_attempts=self._max_attempts,
+                on_retry=lambda attempt, e: metrics.count("retries"),
+                **kwargs,
+            )
+
+
+class ManagedClient:
+    """
+    SDK client wrapper adding rate-limit retries and latency metrics to
+    chat.completions.create(). Other attributes pass through to the SDK.
+
+    Pass factory instead of client to create the SDK client on first use,
+    so runs answered entirely from the cache never import the SDK.
+    """
+
+    def __init__(self, client=None, metrics=None, max_attempts=5, factory=None):
+        self._client = client
+        self._factory = factory
+        self._client_lock = threading.Lock()
+        self.metrics = metrics if metrics is not None else ClientMetrics()
+        self.chat = SimpleNamespace(completions=_ManagedCompletions(self, max_attempts))
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _make_sdk_client(provider, api_key, http_client):
+    # The SDKs retry 429s themselves with a short fixed schedule; turn that
+    # off so call_with_retry() is the single retry policy.
+    if provider == "groq":
+        from groq import Groq
+
+        return Groq(api_key=api_key, http_client=http_client, max_retries=0)
+    if provider == "openai":
+        from openai import OpenAI
+
+        return OpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+def prewarm(provider="groq"):
+    """
+    Import a provider's SDK on a background thread.
+
+    Interactive tools call this at startup so the import (100-300ms) overlaps
+    with loading data or waiting for input instead of delaying the first
+    request. A later import of the same module simply waits for it.
+    """
+    thread = threading.Thread(target=importlib.import_module, args=(SDK_MODULES[provider],), daemon=True)
+    thread.start()
+    return thread
+
+
+def get_client(provider="groq", api_key=None, cached=True, max_attempts=5):
+    """
+    Return the shared client for a provider and API key, creating it on
+    first use.
+
+    One client (and one HTTP connection pool) is kept per (provider, key),
+    so repeated calls reuse open connections instead of paying for a new
+    TCP/TLS handshake every time. The SDK itself is imported only when the
+    first request misses the response cache.
+
+    Args:
+        provider (str): "groq" or "openai".
+        api_key (str, optional): Defaults to GROQ_API_KEY / OPENAI_API_KEY.
+        cached (bool): Answer identical requests from the response cache.
+        max_attempts (int): Attempts per request on rate-limit errors.
+
+    Returns:
+        Client exposing chat.completions.create().
+    """
+    if provider not in API_KEY_ENV:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+    if api_key is None:
+        api_key = os.getenv(API_KEY_ENV[provider])
+    key = (provider, api_key, cached)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            metrics = ClientMetrics()
+            client = ManagedClient(
+                metrics=metrics,
+                max_attempts=max_attempts,
+                factory=lambda: _make_sdk_client(provider, api_key, _make_http_client(metrics)),
+            )
+            if cached:
+                client = CachedChatClient(client)
+            _clients[key] = client
+        return client
+
+
+def client_stats():
+    """
+    Returns:
+        dict: {provider: metrics summary} for every client created so far.
+    """
+    stats = {}
+    with _clients_lock:
+        for (provider, _, _), client in _clients.items():
+            managed = client.client if isinstance(client, CachedChatClient) else client
+            stats.setdefault(provider, []).append(managed.metrics.summary())
+    return stats
+
+
+def format_client_stats():
+    """
+    Returns:
+        str: Human-readable connection and latency summary.
+    """
+    lines = []
+    for provider, summaries in client_stats().items():
+        for s in summaries:
+            lat = s["latency"]
+            lines.append(
+                f"{provider}: {s['http_requests']} HTTP request(s), "
+                f"{s['connections_opened']} connection(s) opened, "
+                f"{s['connections_reused']} reused, {s['retries']} retries; "
+                f"latency p50={lat['p50'] * 1000:.0f}ms p95={lat['p95'] * 1000:.0f}ms "
+                f"p99={lat['p99'] * 1000:.0f}ms"
+            )
+    return "\n".join(lines)
@@ -0,0 +1,77 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+
+def percentile(samples, pct):
+    """
+    Nearest-rank percentile of a list of numbers.
+
+    Args:
+        samples (list): Measured values.
+        pct (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The percentile value (0.0 for an empty list).
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class LatencyTracker:
+    """
+    Thread-safe collector of request latencies.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = []
+        self.labels = []
+
+    def record(self, seconds, label=None):
+        with self._lock:
+            self.samples.append(seconds)
+            self.labels.append(label)
+
+    @contextmanager
+    def measure(self, label=None):
+        """
+        Time the enclosed block and record it.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(time.perf_counter() - start, label)
+
+    def summary(self):
+        """
+        Returns:
+            dict: count, mean, p50, p95, p99 and max latency in seconds.
+        """
+        with self._lock:
+            samples = list(self.samples)
+        return {
+            "count": len(samples),
+            "mean": sum(samples) / len(samples) if samples else 0.0,
+            "p50": percentile(samples, 50),
+            "p95": percentile(samples, 95),
+            "p99": percentile(samples, 99),
+            "max": max(samples) if samples else 0.0,
+        }
+
+    def report(self, title="Latency"):
+        """
+        Returns:
+            str: One-line summary in milliseconds.
+        """
+        s = self.summary()
+        return (
+            f"{title}: n={s['count']} mean={s['mean'] * 1000:.1f}ms "
+            f"p50={s['p50'] * 1000:.1f}ms p95={s['p95'] * 1000:.1f}ms "
+            f"p99={s['p99'] * 1000:.1f}ms max={s['max'] * 1000:.1f}ms"
+        )
@@ -0,0 +1,233 @@
+import math
+import re
+import string
+import threading
+
+TOKEN_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+_FORMATTER = string.Formatter()
+
+
+def estimate_tokens(text):
+    """
+    Estimate how many LLM tokens a text uses, without a tokenizer.
+
+    Counts words and punctuation marks, and falls back to the common
+    "4 characters per token" rule for text with long words or numbers. The
+    study assistant's context budget uses it too.
+
+    Args:
+        text (str): Input text.
+
+    Returns:
+        int: Estimated token count.
+    """
+    return max(len(TOKEN_PIECE_PATTERN.findall(text)), math.ceil(len(text) / 4))
+
+
+def _escape(text):
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+class PromptStats:
+    """
+    Prompt size counters for one template.
+
+    Estimated tokens are counted for every rendered prompt. When the API
+    response reports usage, the real prompt tokens and the part the
+    provider served from its prompt cache are counted as well.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.tokens = 0
+        self.static_tokens = 0
+        self.max_tokens = 0
+        self.api_calls = 0
+        self.api_tokens = 0
+        self.cached_tokens = 0
+
+    def record(self, tokens, static_tokens):
+        with self._lock:
+            self.calls += 1
+            self.tokens += tokens
+            self.static_tokens += static_tokens
+            self.max_tokens = max(self.max_tokens, tokens)
+
+    def record_usage(self, prompt_tokens, cached_tokens):
+        with self._lock:
+            self.api_calls += 1
+            self.api_tokens += prompt_tokens
+            self.cached_tokens += cached_tokens
+
+    def summary(self):
+        """
+        Returns:
+            dict: Calls, mean and max estimated prompt tokens, the share of
+            them in the static prefix, and API-reported prompt and cached
+            tokens per call (when the responses carried usage).
+        """
+        with self._lock:
+            calls, api_calls = self.calls, self.api_calls
+            return {
+                "calls": calls,
+                "mean_tokens": self.tokens / calls if calls else 0.0,
+                "max_tokens": self.max_tokens,
+                "static_share": self.static_tokens / self.tokens if self.tokens else 0.0,
+                "api_calls": api_calls,
+                "api_mean_tokens": self.api_tokens / api_calls if api_calls else 0.0,
+                "cached_share": self.cached_tokens / self.api_tokens if self.api_tokens else 0.0,
+            }
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+class PromptTemplate:
+    """
+    A chat prompt parsed once at import time.
+
+    The template is a str.format string for the user message, with an
+    optional fixed system message. Everything before the first field is the
+    static prefix: requests built from one template all start with the same
+    bytes, so provider-side prompt caching can match them. Keep the per-call text (the
+    article, email or context) in the last fields.
+
+    partial() fixes some fields once (e.g. a tone or a number of sentences)
+    and returns a compiled template whose static prefix includes them.
+    Compiled variants are kept, so a partial is built only the first time.
+    """
+
+    def __init__(self, name, template, system=None, stats=None):
+        self.name = name
+        self.template = template
+        self.system = system
+        self._parts = list(_FORMATTER.parse(template))
+        self.fields = tuple(field for _, field, _, _ in self._parts if field is not None)
+        for field in self.fields:
+            if not field.isidentifier():
+                raise ValueError(f"Prompt {name}: use plain field names, not {{{field}}}")
+        # The literal text before the first field, with {{ }} unescaped.
+        prefix = []
+        for literal, field, _, _ in self._parts:
+            prefix.append(literal)
+            if field is not None:
+                break
+        self.prefix = "".join(prefix)
+        self._system_tokens = estimate_tokens(system) if system else 0
+        self.static_tokens = estimate_tokens(self.prefix) + self._system_tokens
+        self._partials = {}
+        self._partials_lock = threading.Lock()
+        if stats is None:
+            stats = PromptStats()
+            with _templates_lock:
+                _templates[name] = self
+        self.stats = stats
+
+    def partial(self, **values):
+        """
+        Return the template with some fields filled in.
+
+        The result shares this template's stats and is cached by the given
+        values (which must be hashable).
+        """
+        key = tuple(sorted(values.items()))
+        compiled = self._partials.get(key)
+        if compiled is not None:
+            return compiled
+        pieces = []
+        for literal, field, spec, conversion in self._parts:
+            pieces.append(_escape(literal))
+            if field is None:
+                continue
+            if field in values:
+                value = _FORMATTER.convert_field(values[field], conversion)
+                pieces.append(_escape(_FORMATTER.format_field(value, spec)))
+            else:
+                pieces.append("{" + field + (f"!{conversion}" if conversion else "")
+                              + (f":{spec}" if spec else "") + "}")
+        with self._partials_lock:
+            compiled = self._partials.get(key)
+            if compiled is None:
+                compiled = PromptTemplate(self.name, "".join(pieces), self.system, stats=self.stats)
+                self._partials[key] = compiled
+        return compiled
+
+    def render(self, **values):
+        """
+        Format the user message and count its tokens.
+
+        Returns:
+            str: The user message text.
+        """
+        text = self.template.format_map(values) if self.fields else self.prefix
+        self.stats.record(estimate_tokens(text) + self._system_tokens, self.static_tokens)
+        return text
+
+    def messages(self, **values):
+        """
+        Returns:
+            list: Chat messages: the system message (if any) and the user
+            message.
+        """
+        user = {"role": "user", "content": self.render(**values)}
+        if self.system is None:
+            return [user]
+        return [{"role": "system", "content": self.system}, user]
+
+    def record_usage(self, response):
+        """
+        Count the prompt tokens an API response reports, if it has usage.
+
+        Responses answered from the local response cache and stub responses
+        carry no usage and are skipped.
+        """
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        if prompt_tokens is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None) or 0
+        self.stats.record_usage(prompt_tokens, cached_tokens)
+
+    def create(self, client, values, **request):
+        """
+        Send the rendered prompt with client.chat.completions.create().
+
+        Args:
+            client: Client exposing chat.completions.create().
+            values (dict): Template field values.
+            **request: Other create() arguments (model, temperature, ...).
+
+        Returns:
+            The API response.
+        """
+        response = client.chat.completions.create(messages=self.messages(**values), **request)
+        self.record_usage(response)
+        return response
+
+
+def prompt_stats():
+    """
+    Returns:
+        dict: {template name: PromptStats summary} for every template used.
+    """
+    with _templates_lock:
+        templates = list(_templates.values())
+    return {template.name: template.stats.summary() for template in templates if template.stats.calls}
+
+
+def format_prompt_stats():
+    """
+    Returns:
+        str: One line per template with its prompt sizes.
+    """
+    lines = []
+    for name, s in prompt_stats().items():
+        line = (f"{name}: {s['calls']} prompt(s), ~{s['mean_tokens']:.0f} tokens each "
+                f"(max {s['max_tokens']}, {s['static_share']:.0%} static prefix)")
+        if s["api_calls"]:
+            line += f"; API {s['api_mean_tokens']:.0f} tokens/call, {s['cached_share']:.0%} cached"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,30 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter spacing calls evenly to at most rate_per_minute.
+
+    Each caller reserves the next free slot and sleeps until it, so
+    concurrent workers share one request budget without bursting.
+    """
+
+    def __init__(self, rate_per_minute):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """
+        Block until the caller may send its next request.
+        """
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,113 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry point (directory, module) -> import-time budget in milliseconds.
+# The budget covers importing the module only, not the interpreter start.
+ENTRY_POINTS = {
+    ("study assistant", "main"): 60,
+    ("news brief generator", "main"): 60,
+    ("news brief generator", "batch"): 60,
+    ("smart office assistant", "main"): 60,
+    ("NLP/Financial Data Extraction Tool", "helper"): 600,
+    ("NLP/Name Entity Recognition App", "ner"): 3000,
+}
+
+
+def parse_importtime(stderr):
+    """
+    Parse `python -X importtime` output.
+
+    Returns:
+        list: (name, depth, self_us, cumulative_us) per imported module, in
+        the order the interpreter reported them.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure_import(directory, module, runs=5):
+    """
+    Import a module in fresh interpreters and time it.
+
+    Args:
+        directory (str): Directory of the entry point, relative to the repo.
+        module (str): Module name to import.
+        runs (int): Number of fresh interpreters; medians are reported.
+
+    Returns:
+        dict: import_ms (median cumulative import time of the module),
+        wall_ms (median process wall time), and heaviest, the module's
+        direct imports sorted by cumulative time (from the last run). On an
+        import error, error holds the last line of the traceback instead.
+    """
+    cwd = os.path.join(REPO_ROOT, directory)
+    import_us, wall, rows = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                cwd=cwd, capture_output=True, text=True)
+        wall.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1]}
+        rows = parse_importtime(result.stderr)
+        import_us.append(next(cum for name, depth, _, cum in reversed(rows) if name == module and depth == 0))
+
+    # Direct imports of the module are the rows at depth 1 that follow the
+    # previous top-level entry and precede the module's own row.
+    end = max(i for i, row in enumerate(rows) if row[0] == module and row[1] == 0)
+    begin = max((i for i, row in enumerate(rows[:end]) if row[1] == 0), default=-1) + 1
+    direct = [(name, cum / 1000) for name, depth, _, cum in rows[begin:end] if depth == 1]
+    return {
+        "import_ms": statistics.median(import_us) / 1000,
+        "wall_ms": statistics.median(wall) * 1000,
+        "heaviest": sorted(direct, key=lambda item: item[1], reverse=True)[:5],
+    }
+
+
+def interpreter_baseline_ms(runs=5):
+    """Median wall time of `python -c pass`, to compare wall times against."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of every entry point.")
+    parser.add_argument("-r", "--runs", type=int, default=5, help="Fresh interpreters per entry point")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if a budget is exceeded")
+    args = parser.parse_args()
+
+    print(f"Interpreter start: {interpreter_baseline_ms(args.runs):.1f}ms")
+    over_budget = []
+    for (directory, module), budget in ENTRY_POINTS.items():
+        label = f"{directory}/{module}.py"
+        result = measure_import(directory, module, args.runs)
+        if "error" in result:
+            print(f"{label}: skipped ({result['error']})")
+            continue
+        status = "ok" if result["import_ms"] <= budget else "OVER BUDGET"
+        print(f"{label}: import {result['import_ms']:.1f}ms (budget {budget}ms, {status}), "
+              f"process {result['wall_ms']:.1f}ms")
+        for name, ms in result["heaviest"]:
+            print(f"    {ms:8.1f}ms  {name}")
+        if result["import_ms"] > budget:
+            over_budget.append(label)
+
+    if args.check and over_budget:
+        print("Over budget: " + ", ".join(over_budget))
+        sys.exit(1)
@@ -0,0 +1,94 @@
+import sys
+import time
+
+
+class StreamStats:
+    """
+    Timing of one streamed completion.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        self.finished_at = None
+        self.tokens = 0
+
+    @property
+    def time_to_first_token(self):
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+
+    @property
+    def total_time(self):
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started
+
+    @property
+    def tokens_per_second(self):
+        # Generation speed after the first token arrived.
+        if self.first_token_at is None or self.tokens < 2:
+            return 0.0
+        return (self.tokens - 1) / max(self.total_time - self.time_to_first_token, 1e-9)
+
+    def report(self):
+        ttft = self.time_to_first_token
+        return (
+            f"time to first token {ttft * 1000 if ttft is not None else 0:.0f}ms, "
+            f"{self.tokens} tokens in {self.total_time:.2f}s "
+            f"({self.tokens_per_second:.1f} tokens/s)"
+        )
+
+
+def iter_stream(client, stats=None, **request):
+    """
+    Request a chat completion as a stream and yield its text as it arrives.
+
+    Args:
+        client: Client exposing chat.completions.create().
+        stats (StreamStats, optional): Filled with timing as tokens arrive.
+        **request: Arguments for chat.completions.create() (stream=True is
+            added).
+
+    Yields:
+        str: Text deltas, in order. Each streamed delta counts as a token.
+    """
+    stats = stats if stats is not None else StreamStats()
+    stream = client.chat.completions.create(stream=True, **request)
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        if stats.first_token_at is None:
+            stats.first_token_at = time.perf_counter()
+        stats.tokens += 1
+        yield delta
+    stats.finished_at = time.perf_counter()
+
+
+def print_token(token):
+    sys.stdout.write(token)
+    sys.stdout.flush()
+
+
+def stream_completion(client, on_token=print_token, **request):
+    """
+    Stream a chat completion, handing each token to on_token as it arrives.
+
+    Args:
+        client: Client exposing chat.completions.create().
+        on_token (callable): Called with each text delta; prints by default.
+        **request: Arguments for chat.completions.create().
+
+    Returns:
+        tuple: (full response text, StreamStats).
+    """
+    stats = StreamStats()
+    parts = []
+    for token in iter_stream(client, stats, **request):
+        parts.append(token)
+        if on_token is not None:
+            on_token(token)
+    return "".join(parts), stats
@@ -0,0 +1,45 @@
+import threading
+import time
+from types import SimpleNamespace
+
+
+def echo_reply(model, messages, **kwargs):
+    """
+    Default stub reply: echo the start of the last message.
+    """
+    return f"[{model}] " + messages[-1]["content"][:200]
+
+
+class StubChatClient:
+    """
+    Offline stand-in for a Groq/OpenAI client.
+
+    Supports client.chat.completions.create(...) with the same response
+    shape (response.choices[0].message.content), sleeping for a fixed
+    latency to mimic a network round-trip. Every call is logged so tests
+    and benchmarks can check what was sent.
+    """
+
+    def __init__(self, latency=0.5, reply_fn=echo_reply):
+        """
+        Args:
+            latency (float): Seconds each call takes.
+            reply_fn (callable): Builds the reply text from the
+                create() keyword arguments.
+        """
+        self.latency = latency
+        self.reply_fn = reply_fn
+        self.calls = []
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, **kwargs):
+        with self._lock:
+            self.calls.append({"model": model, "messages": messages, **kwargs})
+        time.sleep(self.latency)
+        content = self.reply_fn(model=model, messages=messages, **kwargs)
+        message = SimpleNamespace(role="assistant", content=content)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+        )
@@ -0,0 +1,123 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubChatHandler(BaseHTTPRequestHandler):
+    """
+    Minimal OpenAI-compatible chat completions endpoint for offline tests.
+
+    Answers POST .../chat/completions (so it works for both the Groq and
+    OpenAI SDKs) by echoing the last message. With "stream": true the reply
+    is sent as server-sent events, one word per event, like the real APIs.
+    """
+
+    protocol_version = "HTTP/1.1"
+    first_token_delay = 0.2
+    token_delay = 0.02
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply_text(self, body):
+        return "Echo: " + body["messages"][-1]["content"][:500]
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        text = self._reply_text(body)
+        if body.get("stream"):
+            self._send_stream(body["model"], text)
+        else:
+            self._send_json(body["model"], text)
+
+    def _send_json(self, model, text):
+        time.sleep(self.first_token_delay + self.token_delay * len(text.split()))
+        payload = json.dumps({
+            "id": "stub-completion",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                         "finish_reason": "stop"}],
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_stream(self, model, text):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        time.sleep(self.first_token_delay)
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            delta = word if i == 0 else " " + word
+            self._send_event(model, {"content": delta}, None)
+            time.sleep(self.token_delay)
+        self._send_event(model, {}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def _send_event(self, model, delta, finish_reason):
+        chunk = {
+            "id": "stub-completion",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        self.wfile.write(b"data: " + json.dumps(chunk).encode("utf-8") + b"\n\n")
+        self.wfile.flush()
+
+
+def start_stub_server(host="127.0.0.1", port=0, first_token_delay=0.2, token_delay=0.02):
+    """
+    Start the stub server on a background thread.
+
+    Point the SDKs at it with GROQ_BASE_URL=<base_url> or
+    OPENAI_BASE_URL=<base_url>/v1.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to bind; 0 picks a free one.
+        first_token_delay (float): Seconds before the first token.
+        token_delay (float): Seconds between streamed tokens.
+
+    Returns:
+        tuple: (server, base_url). Call server.shutdown() to stop it.
+    """
+    handler = type("ConfiguredStubChatHandler", (StubChatHandler,), {
+        "first_token_delay": first_token_delay,
+        "token_delay": token_delay,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stub chat completions server.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(port=args.port, first_token_delay=args.first_token_delay,
+                                         token_delay=args.token_delay)
+    print(f"Stub server listening on {base_url}")
+    print(f"  GROQ_BASE_URL={base_url}  OPENAI_BASE_URL={base_url}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,123 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from main import SUMMARY_STYLES, score_summaries
+from llm_common.batch import run_resumable
+from llm_common.clients import format_client_stats, get_client
+from llm_common.latency import LatencyTracker
+from llm_common.prompts import format_prompt_stats
+from llm_common.stub import StubChatClient
+
+load_dotenv()
+
+
+def iter_articles(source):
+    """
+    Stream (article_id, text) pairs from a directory or a JSONL feed.
+
+    A directory yields every .txt file (id = path relative to the
+    directory, without extension). A JSONL file yields one article per line
+    with an "id" and a "text" field ("article" or "content" are accepted
+    too). Articles are read one at a time, never all at once.
+
+    Args:
+        source (str): Directory of .txt files or path to a .jsonl file.
+
+    Yields:
+        tuple: (article_id, text) pairs.
+    """
+    if os.path.isdir(source):
+        for path in sorted(glob.glob(os.path.join(source, "**", "*.txt"), recursive=True)):
+            article_id = os.path.splitext(os.path.relpath(path, source))[0]
+            with open(path, "r", encoding="utf-8") as f:
+                yield article_id, f.read()
+        return
+
+    with open(source, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            text = record.get("text") or record.get("article") or record.get("content") or ""
+            yield str(record.get("id", f"line-{line_number}")), text
+
+
+def brief_article(client, article_id, text, styles=None, tracker=None):
+    """
+    Produce every summary style for one article and pick the best one.
+
+    Returns:
+        dict: Output record with summaries, keyword scores and best style.
+    """
+    styles = styles or SUMMARY_STYLES
+    summaries = {}
+    for label, summarize in styles.items():
+        start = time.perf_counter()
+        summaries[label] = summarize(client, text)
+        if tracker is not None:
+            tracker.record(time.perf_counter() - start, label)
+    scores = score_summaries(text, summaries)
+    best = max(scores, key=scores.get)
+    return {"id": article_id, "summaries": summaries, "scores": scores, "best": best}
+
+
+def run_batch(client, source, output_path, max_workers=8, styles=None):
+    """
+    Brief every article from source and append results to a JSONL file.
+
+    The run is resumable (see llm_common.batch.run_resumable): re-running
+    with the same output file skips the articles already briefed.
+
+    Args:
+        client (Groq): Groq client (or any client with the same interface).
+        source (str): Directory of .txt files or a .jsonl feed.
+        output_path (str): JSONL file to append results to.
+        max_workers (int): Maximum number of articles processed concurrently.
+        styles (dict): {label: fn(client, text)}; defaults to SUMMARY_STYLES.
+
+    Returns:
+        dict: Counts of processed, skipped and failed articles, elapsed
+        seconds and the per-call LatencyTracker.
+    """
+    tracker = LatencyTracker()
+    counts = run_resumable(iter_articles(source),
+                           lambda article_id, text: brief_article(client, article_id, text, styles, tracker),
+                           output_path, max_workers)
+    counts["latency"] = tracker
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate news briefs for a batch of articles.")
+    parser.add_argument("source", help="Directory of .txt articles or a JSONL feed")
+    parser.add_argument("-o", "--output", default="briefs.jsonl", help="JSONL output file")
+    parser.add_argument("-w", "--workers", type=int, default=8, help="Concurrent articles")
+    parser.add_argument("--stub", action="store_true", help="Use an offline stub client")
+    args = parser.parse_args()
+
+    if args.stub:
+        client = StubChatClient(latency=float(os.getenv("LLM_STUB_LATENCY", "0.5")))
+    else:
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
+            print("Error: GROQ_API_KEY not found in environment variables.")
+            exit(1)
+        client = get_client("groq", api_key)
+
+    result = run_batch(client, args.source, args.output, max_workers=args.workers)
+    minutes = result["elapsed"] / 60
+    print(f"Processed {result['processed']} article(s), skipped {result['skipped']}, "
+          f"failed {result['failed']} in {result['elapsed']:.1f}s")
+    print(f"Throughput: {result['processed'] / minutes if minutes else 0:.1f} articles/minute")
+    print(result["latency"].report("Per-call latency"))
+    connection_stats = format_client_stats()
+    if connection_stats:
+        print(connection_stats)
+    print(format_prompt_stats())
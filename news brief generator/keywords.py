@@ -0,0 +1,203 @@
+import argparse
+import itertools
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Punctuation stripped from the start and end of each word.
+STRIP_CHARS = ".,!?"
+MIN_KEYWORD_LENGTH = 5
+
+
+def extract_keywords(text):
+    """
+    Extract keywords from the given text in a single pass.
+
+    Same result as lowercasing, splitting on whitespace, stripping .,!? from
+    both ends of each word with re.sub and keeping words longer than 4
+    characters, but str.strip does the stripping without a regex call per
+    word.
+
+    Args:
+        text (str): Input text.
+
+    Returns:
+        set: Set of extracted keywords.
+    """
+    return {word for word in map(str.strip, text.lower().split(), itertools.repeat(STRIP_CHARS))
+            if len(word) >= MIN_KEYWORD_LENGTH}
+
+
+class KeywordScorer:
+    """
+    Keyword-overlap scoring of summaries against articles.
+
+    score = overlap_count / (total_article_keywords + 1)
+
+    Article keyword sets are computed once and kept in an LRU cache, so
+    ranking several summaries of the same article extracts its keywords
+    only once. For many-to-many scoring, keywords are mapped to integer ids
+    through a vocabulary (a dict, not feature hashing, so there are no
+    collisions and scores match exactly) and the overlaps computed as one
+    sparse matrix product.
+    """
+
+    def __init__(self, max_cached_articles=4096):
+        self.vocabulary = {}
+        self.max_cached_articles = max_cached_articles
+        self._articles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def article_keywords(self, article):
+        """Keyword set of an article, cached by its text."""
+        with self._lock:
+            keywords = self._articles.get(article)
+            if keywords is not None:
+                self._articles.move_to_end(article)
+                return keywords
+        keywords = extract_keywords(article)
+        with self._lock:
+            self._articles[article] = keywords
+            while len(self._articles) > self.max_cached_articles:
+                self._articles.popitem(last=False)
+        return keywords
+
+    def score(self, article, summaries):
+        """
+        Score each summary against one article.
+
+        Args:
+            article (str): The original article text.
+            summaries (dict): {label: summary text}.
+
+        Returns:
+            dict: {label: score}, in the same order as summaries.
+        """
+        article_keywords = self.article_keywords(article)
+        denominator = len(article_keywords) + 1
+        return {label: len(article_keywords & extract_keywords(summary)) / denominator
+                for label, summary in summaries.items()}
+
+    def _ids(self, keywords):
+        # A new word gets the next dense id (the vocabulary size), so the
+        # matrix width stays equal to the number of distinct keywords.
+        vocabulary = self.vocabulary
+        with self._lock:
+            return [vocabulary.setdefault(word, len(vocabulary)) for word in keywords]
+
+    def score_matrix(self, articles, summaries):
+        """
+        Score every summary against every article.
+
+        Keyword sets become sparse binary matrices, so all overlap counts
+        are a single sparse matrix product.
+
+        Args:
+            articles (list): Article texts.
+            summaries (list): Summary texts.
+
+        Returns:
+            numpy.ndarray: scores[i, j] of summary j against article i.
+        """
+        import numpy as np
+        from scipy import sparse
+
+        def csr(keyword_sets):
+            rows = [self._ids(keywords) for keywords in keyword_sets]
+            indptr = np.cumsum([0] + [len(ids) for ids in rows])
+            indices = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=indptr[-1])
+            return indptr, indices
+
+        a_indptr, a_indices = csr([self.article_keywords(article) for article in articles])
+        s_indptr, s_indices = csr([extract_keywords(summary) for summary in summaries])
+        width = len(self.vocabulary)
+        a = sparse.csr_matrix((np.ones(len(a_indices)), a_indices, a_indptr), shape=(len(articles), width))
+        s = sparse.csr_matrix((np.ones(len(s_indices)), s_indices, s_indptr), shape=(len(summaries), width))
+        overlap = (a @ s.T).toarray()
+        return overlap / (np.diff(a_indptr)[:, None] + 1)
+
+
+default_scorer = KeywordScorer()
+
+
+def _legacy_extract_keywords(text):
+    # The original implementation, kept as the benchmark baseline.
+    clean_words = set()
+    for w in text.lower().split():
+        w = re.sub(r"^[.,!?]+|[.,!?]+$", "", w)
+        if len(w) > 4:
+            clean_words.add(w)
+    return clean_words
+
+
+def _legacy_score_summaries(article, summaries):
+    article_keywords = _legacy_extract_keywords(article)
+    return {label: len(article_keywords & _legacy_extract_keywords(summary)) / (len(article_keywords) + 1)
+            for label, summary in summaries.items()}
+
+
+def make_corpus(n_articles, n_summaries=3, article_words=400, summary_words=60, seed=0):
+    """Synthetic articles and candidate summaries drawn from a shared vocabulary."""
+    rng = random.Random(seed)
+    words = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 10)))
+             for _ in range(20000)]
+    punctuation = ["", "", "", ",", ".", "!", "?", "..."]
+    articles, summaries = [], []
+    for _ in range(n_articles):
+        body = [rng.choice(words).capitalize() if rng.random() < 0.1 else rng.choice(words)
+                for _ in range(article_words)]
+        articles.append(" ".join(w + rng.choice(punctuation) for w in body))
+        summaries.append({
+            f"style-{k}": " ".join(rng.choice(body if rng.random() < 0.7 else words) + rng.choice(punctuation)
+                                   for _ in range(summary_words))
+            for k in range(n_summaries)
+        })
+    return articles, summaries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark keyword-overlap scoring.")
+    parser.add_argument("-n", "--articles", type=int, default=2000, help="Number of articles")
+    parser.add_argument("-s", "--summaries", type=int, default=3, help="Candidate summaries per article")
+    parser.add_argument("-r", "--rounds", type=int, default=3,
+                        help="Times each article is ranked (e.g. after regenerating summaries)")
+    args = parser.parse_args()
+
+    articles, summaries = make_corpus(args.articles, args.summaries)
+
+    def timed(fn):
+        start = time.perf_counter()
+        result = fn()
+        return result, time.perf_counter() - start
+
+    legacy, legacy_seconds = timed(lambda: [
+        [_legacy_score_summaries(a, s) for a, s in zip(articles, summaries)] for _ in range(args.rounds)])
+    scorer = KeywordScorer()
+    cached, cached_seconds = timed(lambda: [
+        [scorer.score(a, s) for a, s in zip(articles, summaries)] for _ in range(args.rounds)])
+    assert legacy == cached, "scores differ from the original implementation"
+
+    pairs = args.articles * args.summaries * args.rounds
+    print(f"Ranking: {args.articles} articles x {args.summaries} summaries x {args.rounds} rounds "
+          f"({pairs} pairs), scores identical")
+    for name, seconds in [("original (re.sub per word)", legacy_seconds),
+                          ("KeywordScorer.score (cached)", cached_seconds)]:
+        print(f"  {name:30s} {seconds * 1000:8.1f}ms  {pairs / seconds:10.0f} pairs/s  "
+              f"{legacy_seconds / seconds:5.1f}x")
+
+    # Every summary against every article: a loop over score() versus one
+    # sparse matrix product.
+    k = min(200, args.articles)
+    flat = [text for candidates in summaries[:k] for text in candidates.values()]
+    labelled = dict(enumerate(flat))
+    scorer = KeywordScorer()
+    looped, looped_seconds = timed(lambda: [list(scorer.score(a, labelled).values()) for a in articles[:k]])
+    matrix, matrix_seconds = timed(lambda: KeywordScorer().score_matrix(articles[:k], flat))
+    assert matrix.tolist() == looped, "score_matrix differs from score"
+    print(f"All pairs: {k} articles x {len(flat)} summaries ({matrix.size} pairs), scores identical")
+    for name, seconds in [("KeywordScorer.score loop", looped_seconds),
+                          ("KeywordScorer.score_matrix", matrix_seconds)]:
+        print(f"  {name:30s} {seconds * 1000:8.1f}ms  {matrix.size / seconds:10.0f} pairs/s  "
+              f"{looped_seconds / seconds:5.1f}x")
@@ -1,11 +1,41 @@
-from groq import Groq
-import re
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from llm_common.clients import format_client_stats, get_client
+from llm_common.latency import LatencyTracker
+from llm_common.prompts import PromptTemplate, format_prompt_stats
+from llm_common.stub import StubChatClient
+import keywords
+
 # Load environment variables from .env file
 load_dotenv()
 
+# Parsed once. The system message and instructions come before the article,
+# so every call of a style starts with the same text; partial() fixes the
+# number of points or sentences into that prefix.
+SUMMARIZER_SYSTEM = "You are a concise and clear summarizer."
+BULLET_POINTS_PROMPT = PromptTemplate(
+    "news.bullet_points",
+    "Summarize the following text in {num_points} concise bullet points:\n\n{text}",
+    system=SUMMARIZER_SYSTEM,
+)
+ABSTRACT_PROMPT = PromptTemplate(
+    "news.abstract",
+    "Summarize the following text as a {sentence_count}-sentence abstract:\n\n{text}",
+    system=SUMMARIZER_SYSTEM,
+)
+SIMPLE_ENGLISH_PROMPT = PromptTemplate(
+    "news.simple_english",
+    "Summarize the following text in simple English suitable for a 12-year-old, "
+    "in {sentence_count} sentences:\n\n{text}",
+    system="You are a kind teacher explaining things simply.",
+)
+SUMMARY_MODEL = "llama-3.1-8b-instant"
+
 def bullet_point_summary(client, text, num_points=5):
     """
     Summarize text into concise bullet points.
@@ -19,7 +49,7 @@ def bullet_point_summary(client, text, num_points=5):
         str: Generated bullet-point style summary.
     """
     # Build prompt
-    prompt = f"Summarize the following text in {num_points} concise bullet points:\n\n{text}"
+    prompt = BULLET_POINTS_PROMPT.partial(num_points=num_points)
 
     # TODO: Call Groq API with model = "llama-3.1-8b-instant"
     # Use temperature = 0.3 and max_completion_tokens = 300
@@ -28,12 +58,10 @@ def bullet_point_summary(client, text, num_points=5):
     # - user message: Should contain the prompt
 
     # TODO: Parse and return the response text
-    system_message = {"role":"system", "content":"You are a concise and clear summarizer."}
-    user_message = {"role": "user", "content":prompt}
-
-    reponse = client.chat.completions.create(
-        model = "llama-3.1-8b-instant",
-        messages = [system_message, user_message],
+    reponse = prompt.create(
+        client,
+        {"text": text},
+        model = SUMMARY_MODEL,
         temperature = 0.3,
         max_completion_tokens = 300,
     )
@@ -53,7 +81,7 @@ def abstract_style_summary(client, text, sentence_count=5):
         str: Generated abstract-style summary.
     """
     # Build prompt
-    prompt = f"Summarize the following text as a {sentence_count}-sentence abstract:\n\n{text}"
+    prompt = ABSTRACT_PROMPT.partial(sentence_count=sentence_count)
 
     # TODO: Call Groq API with model = "llama-3.1-8b-instant"
     # Use temperature = 0.3 and max_completion_tokens = 300
@@ -62,12 +90,10 @@ def abstract_style_summary(client, text, sentence_count=5):
     # - user message: Should contain the prompt
 
     # TODO: Parse and return the response text
-    system_message = {"role":"system", "content":"You are a concise and clear summarizer."}
-    user_message = {"role": "user", "content":prompt}
-
-    reponse = client.chat.completions.create(
-        model = "llama-3.1-8b-instant",
-        messages = [system_message, user_message],
+    reponse = prompt.create(
+        client,
+        {"text": text},
+        model = SUMMARY_MODEL,
         temperature = 0.3,
         max_completion_tokens = 300,
     )
@@ -87,10 +113,7 @@ def simple_english_summary(client, text, sentence_count=5):
         str: Generated simple-English style summary.
     """
     # Build prompt
-    prompt = (
-        f"Summarize the following text in simple English suitable for a 12-year-old, "
-        f"in {sentence_count} sentences:\n\n{text}"
-    )
+    prompt = SIMPLE_ENGLISH_PROMPT.partial(sentence_count=sentence_count)
 
     # TODO: Call Groq API with model = "llama-3.1-8b-instant"
     # Use temperature = 0.3 and max_completion_tokens = 300
@@ -99,18 +122,58 @@ def simple_english_summary(client, text, sentence_count=5):
     # - user message: Should contain the prompt
 
     # TODO: Parse and return the response text
-    system_message = {"role":"system", "content":"You are a kind teacher explaining things simply."}
-    user_message = {"role": "user", "content":prompt}
-
-    reponse = client.chat.completions.create(
-        model = "llama-3.1-8b-instant",
-        messages = [system_message, user_message],
+    reponse = prompt.create(
+        client,
+        {"text": text},
+        model = SUMMARY_MODEL,
         temperature = 0.3,
         max_completion_tokens = 300,
     )
     return reponse.choices[0].message.content.strip()
 
 
+# Summary styles run for every article, keyed by the label used in the output
+SUMMARY_STYLES = {
+    "Bullet Points": lambda client, text: bullet_point_summary(client, text, num_points=5),
+    "Abstract": lambda client, text: abstract_style_summary(client, text, sentence_count=5),
+    "Simple English": lambda client, text: simple_english_summary(client, text, sentence_count=5),
+}
+
+
+def summarize_concurrently(client, articles, styles=None, max_workers=8, tracker=None):
+    """
+    Run every summary style for every article concurrently.
+
+    The summary calls spend nearly all their time waiting on the API, so
+    running them on a thread pool makes the wall-clock time close to the
+    slowest call instead of the sum of all calls. max_workers caps how many
+    requests are in flight at once (N articles x M styles can be large).
+
+    Args:
+        client (Groq): Groq client (or any client with the same interface).
+        articles (list): Article texts.
+        styles (dict): {label: fn(client, text)}; defaults to SUMMARY_STYLES.
+        max_workers (int): Maximum number of concurrent requests.
+        tracker (LatencyTracker, optional): Records per-call latency.
+
+    Returns:
+        list: One {label: summary} dict per article, in input order.
+    """
+    styles = styles or SUMMARY_STYLES
+    tracker = tracker if tracker is not None else LatencyTracker()
+
+    def run(style, article):
+        with tracker.measure(style):
+            return styles[style](client, article)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            {style: pool.submit(run, style, article) for style in styles}
+            for article in articles
+        ]
+        return [{style: future.result() for style, future in jobs.items()} for jobs in futures]
+
+
 # Keyword extractor function
 def extract_keywords(text):
     """
@@ -128,13 +191,26 @@ def extract_keywords(text):
     # TODO: Strip punctuation (.,!?) at the start or end of words.
     # TODO: Ignore words with length <= 4
     # TODO: Collect results into a set and return
-    words = text.lower().split()
-    clean_words = set()
-    for w in words:
-        w = re.sub(r"^[.,!?]+|[.,!?]+$", "", w)
-        if len(w) > 4:
-            clean_words.add(w)
-    return clean_words
+    # One pass with str.strip instead of a re.sub call per word
+    return keywords.extract_keywords(text)
+
+
+def score_summaries(article, summaries):
+    """
+    Compute the keyword overlap score of each summary against the article.
+
+    score = overlap_count / (total_article_keywords + 1)
+
+    Args:
+        article (str): The original article text.
+        summaries (dict): Dictionary of summaries with labels as keys.
+
+    Returns:
+        dict: {label: score}, in the same order as summaries.
+    """
+    # The article's keywords are cached, so scoring it again (e.g. from
+    # best_summary_by_keywords) does not re-extract them
+    return keywords.default_scorer.score(article, summaries)
 
 
 # Choose best summary (Keyword Overlap)
@@ -165,53 +241,55 @@ def best_summary_by_keywords(article, summaries) -> str:
     Returns:
         str: The best summary (label + text).
     """
-    # TODO: Extract keywords from article
-    article_keywords = extract_keywords(article)
-    # TODO: Iterate over summaries
-    #    - Extract keywords for each summary
-    #    - Compute overlap with article keywords
-    #    - Calculate score using formula
-    #    - Print score in required format
-    #    - Update best summary if score is higher
     best_label, best_summary, best_score = None, None, -1
 
-    for label, summary in summaries.items():
-        summary_keywords = extract_keywords(summary)
-        overlap = article_keywords & summary_keywords
-        score = len(overlap) / (len(article_keywords) + 1)
+    for label, score in score_summaries(article, summaries).items():
         print(f"Keyword overlap score for {label}: {score:.4f}")
         if score > best_score:
-            best_label, best_summary, best_score = label, summary, score
+            best_label, best_summary, best_score = label, summaries[label], score
     # TODO: Return the best summary with label and text like:
     #       f"Best Summary (by keywords: {best_label}):\n{best_summary}"
 
     return f"Best Summary (by keywords: {best_label}):\n{best_summary}"
 
 if __name__ == "__main__":
-    # Get API key from environment variable
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        api_key = input("Enter your Groq API key: ").strip()
-    
-    client = Groq(api_key=api_key)
+    if os.getenv("LLM_STUB", "").lower() in {"1", "true", "yes"}:
+        # Offline run against a fake client, e.g. to measure concurrency.
+        client = StubChatClient(latency=float(os.getenv("LLM_STUB_LATENCY", "0.5")))
+    else:
+        # Get API key from environment variable
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
+            api_key = input("Enter your Groq API key: ").strip()
+
+        # Shared client: pooled connections, rate-limit retries and the
+        # response cache for re-runs on the same article
+        client = get_client("groq", api_key)
 
     filepath = "article.txt"
     with open(filepath, "r", encoding="utf-8") as f:
         content = f.read()
 
-    bullet_summary = bullet_point_summary(client, content, num_points=5)
-    abstract_summary = abstract_style_summary(client, content, sentence_count=5)
-    simple_summary = simple_english_summary(client, content, sentence_count=5)
-
-    print("\n--- Bullet-point Summary ---\n", bullet_summary)
-    print("\n--- Abstract Summary ---\n", abstract_summary)
-    print("\n--- Simple English Summary ---\n", simple_summary)
-
-    summaries = {
-        "Bullet Points": bullet_summary,
-        "Abstract": abstract_summary,
-        "Simple English": simple_summary,
-    }
+    # Run the three summary styles concurrently instead of one after another
+    tracker = LatencyTracker()
+    start = time.perf_counter()
+    summaries = summarize_concurrently(client, [content], tracker=tracker)[0]
+    total = time.perf_counter() - start
+
+    print("\n--- Bullet-point Summary ---\n", summaries["Bullet Points"])
+    print("\n--- Abstract Summary ---\n", summaries["Abstract"])
+    print("\n--- Simple English Summary ---\n", summaries["Simple English"])
+
+    print()
+    for label, seconds in zip(tracker.labels, tracker.samples):
+        print(f"{label} call: {seconds * 1000:.0f}ms")
+    print(f"Total wall-clock time: {total * 1000:.0f}ms "
+          f"(sequential would be ~{sum(tracker.samples) * 1000:.0f}ms)")
+
+    connection_stats = format_client_stats()
+    if connection_stats:
+        print(connection_stats)
+    print(format_prompt_stats())
 
     final_summary = best_summary_by_keywords(content, summaries)
     print("\nFinal Chosen Summary:\n", final_summary)
@@ -0,0 +1,193 @@
+import argparse
+import csv
+import json
+import mailbox
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from main import TONE_CHOICES, build_prompt, complete_reply
+from llm_common.batch import run_resumable
+from llm_common.clients import format_client_stats, get_client
+from llm_common.latency import LatencyTracker
+from llm_common.prompts import format_prompt_stats
+from llm_common.ratelimit import RateLimiter
+from llm_common.stub import StubChatClient
+
+load_dotenv()
+
+EMAIL_FIELDS = ("email", "email_text", "body", "text")
+BULLET_FIELDS = ("bullet_points", "bullets", "points")
+
+
+def parse_bullet_points(value):
+    """
+    Normalize bullet points to a list of non-empty strings.
+
+    Args:
+        value (list or str): A list, or a comma-separated string as typed in
+            interactive mode.
+
+    Returns:
+        list: Stripped bullet points.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(point).strip() for point in value if str(point).strip()]
+
+
+def parse_tone(value, default="formal"):
+    """
+    Accept a tone name or its interactive menu number (1-4).
+    """
+    value = str(value or "").strip().lower()
+    if value in TONE_CHOICES:
+        return TONE_CHOICES[value]
+    return value if value in TONE_CHOICES.values() else default
+
+
+def _message_text(message):
+    # Plain-text body of an email, ignoring attachments and HTML parts.
+    parts = message.walk() if message.is_multipart() else [message]
+    for part in parts:
+        if part.get_content_type() == "text/plain" and not part.get_filename():
+            payload = part.get_payload(decode=True) or b""
+            return payload.decode(part.get_content_charset() or "utf-8", errors="replace").strip()
+    return ""
+
+
+def iter_emails(source, default_bullets=(), default_tone="formal"):
+    """
+    Stream email records from a CSV, JSONL or mbox file.
+
+    CSV and JSONL records have an "id" (defaults to the row number), the
+    email text ("email", "email_text", "body" or "text"), "bullet_points"
+    (a list or a comma-separated string) and "tone" (a name or 1-4). In an
+    mbox file every message is one email: its id is the Message-ID header
+    and its text the subject plus the plain-text body; bullet points and
+    tone come from the defaults. Records are read one at a time.
+
+    Args:
+        source (str): Path to a .csv, .jsonl or .mbox file.
+        default_bullets (list): Bullet points for records without any.
+        default_tone (str): Tone for records without one.
+
+    Yields:
+        dict: id, email_text, bullet_points and tone.
+    """
+    extension = os.path.splitext(source)[1].lower()
+
+    if extension in (".mbox", ".mbx"):
+        for index, message in enumerate(mailbox.mbox(source, create=False), 1):
+            subject = message.get("Subject", "")
+            body = _message_text(message)
+            yield {
+                "id": (message.get("Message-ID") or f"message-{index}").strip(),
+                "email_text": f"Subject: {subject}\n\n{body}" if subject else body,
+                "bullet_points": list(default_bullets),
+                "tone": default_tone,
+            }
+        return
+
+    with open(source, "r", encoding="utf-8", newline="") as f:
+        if extension == ".csv":
+            records = enumerate(csv.DictReader(f), 1)
+        else:
+            records = ((n, json.loads(line)) for n, line in enumerate(f, 1) if line.strip())
+        for row_number, record in records:
+            email_text = next((record[k] for k in EMAIL_FIELDS if record.get(k)), "")
+            bullets = next((record[k] for k in BULLET_FIELDS if record.get(k)), None)
+            yield {
+                "id": str(record.get("id") or f"row-{row_number}"),
+                "email_text": email_text.strip(),
+                "bullet_points": parse_bullet_points(bullets) or list(default_bullets),
+                "tone": parse_tone(record.get("tone"), default_tone),
+            }
+
+
+def draft_reply(client, record, limiter=None, tracker=None):
+    """
+    Draft the reply to one email record.
+
+    Returns:
+        dict: Output record with the id, tone, reply and call latency.
+    """
+    prompt = build_prompt(record["email_text"], record["bullet_points"], record["tone"])
+    if limiter is not None:
+        limiter.wait()
+    start = time.perf_counter()
+    reply = complete_reply(client, prompt)
+    seconds = time.perf_counter() - start
+    if tracker is not None:
+        tracker.record(seconds, record["tone"])
+    return {"id": record["id"], "tone": record["tone"], "reply": reply, "seconds": round(seconds, 3)}
+
+
+def run_batch(client, source, output_path, max_workers=8, requests_per_minute=60,
+              default_bullets=(), default_tone="formal"):
+    """
+    Draft a reply for every email in source and append them to a JSONL file.
+
+    Written through llm_common.batch.run_resumable, so a restarted run with
+    the same output file only drafts the emails not yet answered. All
+    workers share one rate limit.
+
+    Args:
+        client (Groq): Groq client (or any client with the same interface).
+        source (str): A .csv, .jsonl or .mbox file.
+        output_path (str): JSONL file to append results to.
+        max_workers (int): Maximum number of replies drafted concurrently.
+        requests_per_minute (int): API request budget; 0 or None for no limit.
+        default_bullets (list): Bullet points for emails without any.
+        default_tone (str): Tone for emails without one.
+
+    Returns:
+        dict: Counts of processed, skipped and failed emails, elapsed
+        seconds and the per-call LatencyTracker (labelled by tone).
+    """
+    limiter = RateLimiter(requests_per_minute)
+    tracker = LatencyTracker()
+    records = ((record["id"], record) for record in iter_emails(source, default_bullets, default_tone))
+    counts = run_resumable(records, lambda _, record: draft_reply(client, record, limiter, tracker),
+                           output_path, max_workers)
+    counts["latency"] = tracker
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Draft replies for a batch of emails.")
+    parser.add_argument("source", help="CSV, JSONL or mbox file of emails")
+    parser.add_argument("-o", "--output", default="replies.jsonl", help="JSONL output file")
+    parser.add_argument("-w", "--workers", type=int, default=8, help="Concurrent requests")
+    parser.add_argument("--rpm", type=int, default=60, help="Maximum API requests per minute (0 for no limit)")
+    parser.add_argument("--bullets", default="", help="Comma-separated bullet points for emails without any")
+    parser.add_argument("--tone", default="formal", help="Tone for emails without one (name or 1-4)")
+    parser.add_argument("--stub", action="store_true", help="Use an offline stub client")
+    args = parser.parse_args()
+
+    if args.stub:
+        client = StubChatClient(latency=float(os.getenv("LLM_STUB_LATENCY", "0.5")))
+    else:
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
+            print("Error: GROQ_API_KEY not found in environment variables.")
+            exit(1)
+        client = get_client("groq", api_key)
+
+    result = run_batch(client, args.source, args.output, max_workers=args.workers,
+                       requests_per_minute=args.rpm, default_bullets=parse_bullet_points(args.bullets),
+                       default_tone=parse_tone(args.tone))
+    minutes = result["elapsed"] / 60
+    print(f"Drafted {result['processed']} reply(ies), skipped {result['skipped']}, "
+          f"failed {result['failed']} in {result['elapsed']:.1f}s")
+    print(f"Throughput: {result['processed'] / minutes if minutes else 0:.1f} replies/minute")
+    print(result["latency"].report("Per-request latency"))
+    connection_stats = format_client_stats()
+    if connection_stats:
+        print(connection_stats)
+    print(format_prompt_stats())
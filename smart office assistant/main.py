@@ -1,10 +1,27 @@
 import os
+import sys
 from dotenv import load_dotenv
-from groq import Groq
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from llm_common.clients import get_client, prewarm
+from llm_common.prompts import PromptTemplate, format_prompt_stats
+from llm_common.streaming import print_token, stream_completion
 
 # Load environment variables from .env file
 load_dotenv()
 
+TONE_CHOICES = {"1": "formal", "2": "friendly", "3": "concise", "4": "detailed"}
+REPLY_MODEL = "llama-3.3-70b-versatile"
+# Parsed once; partial(tone=...) fixes the tone into the static prefix.
+REPLY_PROMPT = PromptTemplate(
+    "office.reply",
+    "Draft a professional email reply in a {tone} tone based on the following.\n"
+    "Original email: '{email_text}'\n"
+    "Key points to include: {bullet_points}\n"
+    "Reply:",
+)
+
+
 def get_email_text():
     """
     Prompt the user to enter the incoming email text.
@@ -72,8 +89,7 @@ def choose_tone():
     print("3. Concise")
     print("4. Detailed")
     choice = input("Enter your choice (1-4): ").strip()
-    tone_map = {"1": "formal", "2": "friendly", "3": "concise", "4": "detailed"}
-    return tone_map.get(choice, "formal")
+    return TONE_CHOICES.get(choice, "formal")
 
 
 def build_prompt(email_text, bullet_points, tone):
@@ -92,12 +108,7 @@ def build_prompt(email_text, bullet_points, tone):
     2. Insert {tone}, {email_text}, and {bullet_points}.
     3. Return the formatted prompt string.
     """
-    prompt = (
-        f"Draft a professional email reply in a {tone} tone based on the following.\n"
-        f"Original email: '{email_text}'\n"
-        f"Key points to include: {bullet_points}\n"
-        f"Reply:"
-    )
+    prompt = REPLY_PROMPT.partial(tone=tone).render(email_text=email_text, bullet_points=bullet_points)
     # TODO: return the formatted prompt string
     return  prompt
 
@@ -121,20 +132,65 @@ def generate_reply(prompt, api_key):
     """
 
     # TODO: return the assistant's drafted reply
-    client = Groq(api_key=api_key)
+    # Shared client: pooled connections, rate-limit retries and the
+    # response cache for identical prompts
+    client = get_client("groq", api_key)
+    return complete_reply(client, prompt)
+
 
+def complete_reply(client, prompt):
+    """
+    Draft a reply to a prompt with the given client.
+
+    Args:
+        client (Groq): Groq client (or any client with the same interface).
+        prompt (str): Prompt built by build_prompt().
+
+    Returns:
+        str: The drafted reply.
+    """
     completion = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
+        model=REPLY_MODEL,
         messages=[{"role": "user", "content": prompt}],
         temperature=0.3,
         max_completion_tokens=512
     )
 
+    REPLY_PROMPT.record_usage(completion)
     drafted_reply = completion.choices[0].message.content.strip()
     return drafted_reply
 
 
+def stream_reply(prompt, api_key, on_token=print_token):
+    """
+    Stream the drafted reply, handing each token to on_token as it arrives.
+
+    Args:
+        prompt (str): Prompt built by build_prompt().
+        api_key (str): Groq API key.
+        on_token (callable): Called with each piece of text; prints it by
+            default.
+
+    Returns:
+        tuple: (full reply text, StreamStats with time to first token and
+        tokens/second).
+    """
+    client = get_client("groq", api_key)
+    reply, stats = stream_completion(
+        client,
+        on_token=on_token,
+        model=REPLY_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.3,
+        max_completion_tokens=512,
+    )
+    return reply.strip(), stats
+
+
 if __name__ == "__main__":
+    # Import the Groq SDK while the user types
+    prewarm("groq")
+
     # Get inputs
     email_text = get_email_text()
     bullet_points = get_bullet_points()
@@ -145,6 +201,7 @@ if __name__ == "__main__":
 
     # Helpful for debugging
     print("\nGenerated Prompt:\n", prompt)  
+    print(format_prompt_stats())
 
     # Get API key from environment variables
     api_key = os.getenv('GROQ_API_KEY')
@@ -153,9 +210,14 @@ if __name__ == "__main__":
         print("Please set your API key in the .env file.")
         exit(1)
 
-    # Call Groq API
+    # Call Groq API, streaming the reply unless LLM_STREAM=0
     try:
-        reply = generate_reply(prompt, api_key)
-        print("\nDrafted Reply:\n", reply)
+        if os.getenv("LLM_STREAM", "1") != "0":
+            print("\nDrafted Reply:")
+            reply, stats = stream_reply(prompt, api_key)
+            print(f"\n\n[{stats.report()}]")
+        else:
+            reply = generate_reply(prompt, api_key)
+            print("\nDrafted Reply:\n", reply)
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,114 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from llm_common.prompts import estimate_tokens
+
+
+def _merge_pair(first, second, overlap):
+    """
+    Join two word lists if they are neighbouring chunks of one document.
+
+    chunk_text() starts each chunk with the last overlap words of the one
+    before, so exactly that many words must match. A shorter match (say a
+    common word like "the") is a coincidence between unrelated chunks.
+
+    Returns:
+        list or None: The merged word list, or None if they don't overlap.
+    """
+    size = min(overlap, len(second))
+    if size and len(first) >= size and first[-size:] == second[:size]:
+        return first + second[size:]
+    return None
+
+
+def merge_chunks(chunks, overlap=50):
+    """
+    Merge neighbouring chunks that share their overlap words, and drop
+    chunks whose id was already seen.
+
+    Duplicates are found by chunk id rather than by searching passage
+    text, so a short chunk that happens to occur inside another passage is
+    still kept. Passages keep the rank of their best chunk, so the result
+    is still ordered best first.
+
+    Args:
+        chunks (list): Ranked (chunk_id, text) pairs, best first.
+        overlap (int): Overlap used by chunk_text().
+
+    Returns:
+        list: Merged passages, best first.
+    """
+    passages = []
+    seen = set()
+    for chunk_id, chunk in chunks:
+        words = chunk.split()
+        if not words or chunk_id in seen:
+            continue
+        seen.add(chunk_id)
+        passages.append(words)
+        # A new chunk can bridge two passages, so keep merging until stable.
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(passages)):
+                for j in range(len(passages)):
+                    if i == j:
+                        continue
+                    joined = _merge_pair(passages[i], passages[j], overlap)
+                    if joined is not None:
+                        keep, drop = min(i, j), max(i, j)
+                        passages[keep] = joined
+                        del passages[drop]
+                        merged = True
+                        break
+                if merged:
+                    break
+    return [" ".join(words) for words in passages]
+
+
+def build_context(chunks, token_budget=1200, overlap=50, separator="\n\n"):
+    """
+    Assemble ranked chunks into one context string within a token budget.
+
+    Neighbouring chunks are merged, duplicates removed, then passages are
+    added best first while they fit. If even the best passage is too large,
+    it is cut to fit.
+
+    Args:
+        chunks (list): Ranked (chunk_id, text) pairs, best first.
+        token_budget (int): Maximum estimated tokens of the context.
+        overlap (int): Overlap used by chunk_text().
+        separator (str): Text placed between passages.
+
+    Returns:
+        str: Context to pass to build_prompt().
+    """
+    selected = []
+    used = 0
+    separator_tokens = estimate_tokens(separator)
+    for passage in merge_chunks(chunks, overlap):
+        cost = estimate_tokens(passage) + (separator_tokens if selected else 0)
+        if used + cost <= token_budget:
+            selected.append(passage)
+            used += cost
+        elif not selected:
+            selected.append(truncate_to_budget(passage, token_budget))
+            break
+    return separator.join(selected)
+
+
+def truncate_to_budget(text, token_budget):
+    """
+    Cut text at a word boundary so it fits in token_budget.
+    """
+    words = text.split()
+    low, high = 0, len(words)
+    # Binary search on the number of words kept.
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(" ".join(words[:mid])) <= token_budget:
+            low = mid
+        else:
+            high = mid - 1
+    return " ".join(words[:low])
@@ -0,0 +1,351 @@
+import glob
+import json
+import os
+import uuid
+import zlib
+
+import numpy as np
+
+from retriever import tokenize
+
+DENSE_FORMAT_VERSION = 2
+
+
+class HashingEmbedder:
+    """
+    Embed text locally by hashing words and character n-grams into a
+    fixed-size vector (no model download, no network).
+
+    Character n-grams let related word forms ("evaporate", "evaporation")
+    share dimensions, which plain keyword overlap cannot do.
+    """
+
+    def __init__(self, dim=1024, char_ngram=3):
+        """
+        Args:
+            dim (int): Number of hash buckets (embedding dimension).
+            char_ngram (int): Length of character n-grams, 0 to disable.
+        """
+        self.dim = dim
+        self.char_ngram = char_ngram
+
+    def config(self):
+        return {"type": "hashing", "dim": self.dim, "char_ngram": self.char_ngram}
+
+    def _features(self, text):
+        n = self.char_ngram
+        for token in tokenize(text):
+            yield token
+            if n and len(token) > n:
+                padded = f"<{token}>"
+                for i in range(len(padded) - n + 1):
+                    yield padded[i:i + n]
+
+    def embed(self, texts):
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts (list): Texts to embed.
+
+        Returns:
+            np.ndarray: float32 matrix of shape (len(texts), dim) with
+            L2-normalized rows.
+        """
+        rows, cols, signs = [], [], []
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                # crc32 is stable across processes, unlike the built-in hash().
+                h = zlib.crc32(feature.encode("utf-8"))
+                rows.append(row)
+                cols.append(h % self.dim)
+                signs.append(1.0 if h & 0x80000000 else -1.0)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(matrix, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)),
+                  np.array(signs, dtype=np.float32))
+        return normalize_rows(matrix)
+
+
+class SentenceTransformerEmbedder:
+    """
+    Embed text with a locally installed sentence-transformers model.
+    """
+
+    def __init__(self, model_name="all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def config(self):
+        return {"type": "sentence-transformers", "model": self.model_name}
+
+    def embed(self, texts):
+        vectors = self.model.encode(list(texts), convert_to_numpy=True)
+        return normalize_rows(vectors.astype(np.float32, copy=False))
+
+
+def embedder_from_config(config):
+    """
+    Recreate the embedder described by an embedder's config() output.
+    """
+    if config["type"] == "hashing":
+        return HashingEmbedder(dim=config["dim"], char_ngram=config["char_ngram"])
+    if config["type"] == "sentence-transformers":
+        return SentenceTransformerEmbedder(config["model"])
+    raise ValueError(f"Unknown embedder type: {config['type']}")
+
+
+def normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class RandomProjectionLSH:
+    """
+    Approximate nearest-neighbour index using random hyperplane hashing.
+
+    Each table hashes a vector to an n_bits signature (the signs of its
+    projections on random hyperplanes). Similar vectors tend to share a
+    bucket, so a query only needs to score the rows in its own buckets.
+    """
+
+    def __init__(self, dim, n_tables=8, n_bits=12, seed=0):
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((n_tables * n_bits, dim)).astype(np.float32)
+        self.bit_weights = (1 << np.arange(n_bits)).astype(np.int64)
+        self.buckets = []
+
+    def config(self):
+        return {"n_tables": self.n_tables, "n_bits": self.n_bits, "seed": self.seed}
+
+    def signatures(self, vectors):
+        bits = (vectors @ self.planes.T > 0).reshape(len(vectors), self.n_tables, self.n_bits)
+        return bits @ self.bit_weights
+
+    def fit(self, vectors):
+        """
+        Hash every row of the matrix into its bucket in each table.
+        """
+        codes = self.signatures(vectors)
+        self.buckets = []
+        for table in range(self.n_tables):
+            order = np.argsort(codes[:, table], kind="stable")
+            keys, starts = np.unique(codes[order, table], return_index=True)
+            self.buckets.append(dict(zip(keys.tolist(), np.split(order, starts[1:]))))
+        return self
+
+    def candidates(self, query_vector):
+        """
+        Returns:
+            np.ndarray: Row indices sharing at least one bucket with the query.
+        """
+        codes = self.signatures(query_vector[None, :])[0]
+        hits = [self.buckets[t].get(int(code)) for t, code in enumerate(codes)]
+        hits = [h for h in hits if h is not None]
+        if not hits:
+            return np.empty(0, dtype=np.intp)
+        return np.unique(np.concatenate(hits))
+
+
+class DenseIndex:
+    """
+    Dense-vector index over text chunks.
+
+    All chunk embeddings live in one contiguous float32 matrix, so a query is
+    answered with a single matrix-vector product instead of a Python loop.
+    Rows are L2-normalized, so the dot product is the cosine similarity.
+    """
+
+    def __init__(self, embedder=None):
+        self.embedder = embedder or HashingEmbedder()
+        self.vectors = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        self.chunk_ids = []
+        self.chunks = {}
+        self.lsh = None
+
+    @classmethod
+    def from_chunks(cls, chunks, embedder=None, batch_size=256):
+        """
+        Embed the output of chunk_text() into a new index.
+
+        Args:
+            chunks (iterable): Text chunks. Chunk ids are their positions,
+                matching InvertedIndex.from_chunks().
+            embedder: Object with embed(texts) and config(); defaults to
+                HashingEmbedder.
+            batch_size (int): Number of chunks embedded per call.
+
+        Returns:
+            DenseIndex: The populated index.
+        """
+        index = cls(embedder)
+        texts = list(chunks)
+        blocks = [index.embedder.embed(texts[i:i + batch_size])
+                  for i in range(0, len(texts), batch_size)]
+        if blocks:
+            index.vectors = np.ascontiguousarray(np.vstack(blocks))
+        index.chunk_ids = [str(position) for position in range(len(texts))]
+        index.chunks = dict(zip(index.chunk_ids, texts))
+        return index
+
+    def __len__(self):
+        return len(self.chunk_ids)
+
+    def update(self, added, removed, batch_size=256):
+        """
+        Apply an incremental change set: drop the rows of removed chunks and
+        embed only the added ones.
+
+        Args:
+            added (dict): {chunk_id: text} of chunks to add.
+            removed (iterable): Ids of chunks to remove.
+            batch_size (int): Number of chunks embedded per call.
+        """
+        dropped = set(removed) | set(added)
+        keep = [row for row, chunk_id in enumerate(self.chunk_ids) if chunk_id not in dropped]
+        new_ids = list(added)
+        blocks = [self.vectors[keep]]
+        for i in range(0, len(new_ids), batch_size):
+            blocks.append(self.embedder.embed([added[c] for c in new_ids[i:i + batch_size]]))
+        self.vectors = np.ascontiguousarray(np.vstack(blocks))
+        self.chunk_ids = [self.chunk_ids[row] for row in keep] + new_ids
+        for chunk_id in dropped:
+            self.chunks.pop(chunk_id, None)
+        self.chunks.update(added)
+        if self.lsh is not None:
+            self.lsh.fit(self.vectors)
+
+    def build_lsh(self, n_tables=8, n_bits=12, seed=0):
+        """
+        Build an approximate LSH index; search() then only scores the rows
+        in the query's buckets. Worth it for large corpora (100k+ chunks).
+        """
+        self.lsh = RandomProjectionLSH(self.vectors.shape[1], n_tables, n_bits, seed)
+        self.lsh.fit(self.vectors)
+        return self
+
+    def _top_k(self, scores, rows, top_k):
+        k = min(top_k, len(scores))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(self.chunk_ids[rows[i]], float(scores[i])) for i in best]
+
+    def search(self, query, top_k=5, exact=False):
+        """
+        Rank chunks by cosine similarity to the query.
+
+        Args:
+            query (str): User's question.
+            top_k (int): Maximum number of results to return.
+            exact (bool): Score every row even if an LSH index is built.
+
+        Returns:
+            list: (chunk_id, score) tuples, best first.
+        """
+        if not self.chunk_ids:
+            return []
+        query_vector = self.embedder.embed([query])[0]
+        if self.lsh is not None and not exact:
+            rows = self.lsh.candidates(query_vector)
+            if len(rows) >= top_k:
+                return self._top_k(self.vectors[rows] @ query_vector, rows, top_k)
+        rows = np.arange(len(self.chunk_ids))
+        return self._top_k(self.vectors @ query_vector, rows, top_k)
+
+    def search_batch(self, queries, top_k=5):
+        """
+        Rank chunks for many queries with one matrix-matrix product.
+
+        Args:
+            queries (list): Questions.
+            top_k (int): Maximum number of results per question.
+
+        Returns:
+            list: One list of (chunk_id, score) tuples per question.
+        """
+        if not self.chunk_ids:
+            return [[] for _ in queries]
+        scores = self.embedder.embed(queries) @ self.vectors.T
+        rows = np.arange(len(self.chunk_ids))
+        return [self._top_k(row_scores, rows, top_k) for row_scores in scores]
+
+    def top_chunks(self, query, top_k=5):
+        return [self.chunks[chunk_id] for chunk_id, _ in self.search(query, top_k)]
+
+    def save(self, directory):
+        """
+        Write the index to a directory: vectors-<id>.npy holds the raw
+        float32 matrix and meta.json the chunk texts, embedder settings and
+        the name of the vector file.
+
+        Each save writes a new vector file, then moves meta.json into place
+        as the single step that switches to it; older vector files are
+        removed afterwards. A crash at any point leaves meta.json naming a
+        complete vector file for the same chunk list.
+        """
+        os.makedirs(directory, exist_ok=True)
+        vectors_name = f"vectors-{uuid.uuid4().hex}.npy"
+        with open(os.path.join(directory, vectors_name), "wb") as f:
+            np.save(f, self.vectors)
+        meta = {
+            "version": DENSE_FORMAT_VERSION,
+            "embedder": self.embedder.config(),
+            "lsh": self.lsh.config() if self.lsh is not None else None,
+            "vectors": vectors_name,
+            "chunk_ids": self.chunk_ids,
+            "chunks": [self.chunks[chunk_id] for chunk_id in self.chunk_ids],
+        }
+        tmp_path = os.path.join(directory, "meta.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, os.path.join(directory, "meta.json"))
+        for path in glob.glob(os.path.join(directory, "vectors*.npy")):
+            if os.path.basename(path) != vectors_name:
+                try:
+                    os.remove(path)
+                except OSError:
+                    # Still mapped by a reader on some platforms; removed on a later save.
+                    pass
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """
+        Reopen an index written by save().
+
+        Args:
+            directory (str): Directory passed to save().
+            mmap (bool): Memory-map the vector matrix instead of reading it,
+                so only the pages touched by queries are loaded.
+
+        Returns:
+            DenseIndex: The restored index.
+
+        Raises:
+            ValueError: The format is unknown (e.g. an index written by an
+                older version) or the vector file does not match the chunk
+                list.
+            OSError: The vector file named in meta.json is missing.
+        """
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != DENSE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported dense index format in '{directory}'")
+        index = cls(embedder_from_config(meta["embedder"]))
+        index.vectors = np.load(os.path.join(directory, meta["vectors"]),
+                                mmap_mode="r" if mmap else None)
+        if len(index.vectors) != len(meta["chunk_ids"]):
+            raise ValueError(f"Dense index in '{directory}' has {len(index.vectors)} vectors "
+                             f"for {len(meta['chunk_ids'])} chunks")
+        index.chunk_ids = meta["chunk_ids"]
+        index.chunks = dict(zip(meta["chunk_ids"], meta["chunks"]))
+        if meta["lsh"]:
+            index.build_lsh(**meta["lsh"])
+        return index
@@ -0,0 +1,327 @@
+import codecs
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+
+READ_BUFFER_SIZE = 1 << 20  # 1 MiB
+
+
+class IngestStats:
+    """
+    Running byte/chunk counters for an ingestion job.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.bytes_read = 0
+        self.chunks = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def mb_per_s(self):
+        return self.bytes_read / (1024 * 1024) / max(self.elapsed, 1e-9)
+
+    @property
+    def chunks_per_s(self):
+        return self.chunks / max(self.elapsed, 1e-9)
+
+    def report(self):
+        """
+        Returns:
+            str: One-line throughput summary.
+        """
+        return (
+            f"{self.files} file(s), {self.bytes_read / (1024 * 1024):.2f} MB, "
+            f"{self.chunks} chunks in {self.elapsed:.2f}s "
+            f"({self.mb_per_s:.2f} MB/s, {self.chunks_per_s:.1f} chunks/s)"
+        )
+
+
+def iter_words(file_path, buffer_size=READ_BUFFER_SIZE, stats=None):
+    """
+    Yield the words of a text file without reading it all into memory.
+
+    The file is read in fixed-size binary blocks and decoded incrementally,
+    so memory use depends on buffer_size rather than the file size. A word
+    cut in half at a block boundary is carried over to the next block.
+
+    Args:
+        file_path (str): Path to the text file.
+        buffer_size (int): Number of bytes to read per block.
+        stats (IngestStats, optional): Counters updated with bytes read.
+
+    Yields:
+        str: Whitespace-separated words, in file order.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    carry = ""
+    with open(file_path, "rb") as f:
+        while True:
+            block = f.read(buffer_size)
+            final = not block
+            text = carry + decoder.decode(block, final=final)
+            if stats is not None:
+                stats.bytes_read += len(block)
+            if final:
+                yield from text.split()
+                return
+            words = text.split()
+            # Keep the last word back unless the block ended on whitespace.
+            if words and not text[-1].isspace():
+                carry = words.pop()
+            else:
+                carry = ""
+            yield from words
+
+
+def iter_chunks(words, chunk_size=300, overlap=50):
+    """
+    Group a stream of words into overlapping chunks.
+
+    Produces exactly the same chunks as chunk_text() in main.py, but only
+    keeps one chunk's worth of words in memory at a time.
+
+    Args:
+        words (iterable): Stream of words.
+        chunk_size (int): Maximum number of words per chunk.
+        overlap (int): Number of overlapping words between chunks.
+
+    Yields:
+        str: Each chunk as a single space-joined string.
+    """
+    step = chunk_size - overlap
+    if step <= 0:
+        raise ValueError("overlap must be smaller than chunk_size")
+
+    window = deque()
+    for word in words:
+        window.append(word)
+        if len(window) == chunk_size:
+            yield " ".join(window)
+            for _ in range(step):
+                window.popleft()
+    # chunk_text() keeps starting new windows while words remain, so the
+    # tail is emitted step by step the same way.
+    while window:
+        yield " ".join(window)
+        for _ in range(min(step, len(window))):
+            window.popleft()
+
+
+def iter_document_chunks(file_path, chunk_size=300, overlap=50, stats=None):
+    """
+    Stream the overlapping chunks of a single text file.
+
+    Args:
+        file_path (str): Path to the text file.
+        chunk_size (int): Maximum number of words per chunk.
+        overlap (int): Number of overlapping words between chunks.
+        stats (IngestStats, optional): Counters updated as the file is read.
+
+    Yields:
+        str: Each chunk of the file.
+    """
+    for chunk in iter_chunks(iter_words(file_path, stats=stats), chunk_size, overlap):
+        if stats is not None:
+            stats.chunks += 1
+        yield chunk
+    if stats is not None:
+        stats.files += 1
+
+
+def list_documents(directory, pattern="*.txt"):
+    """
+    List the text files of a corpus directory.
+
+    Args:
+        directory (str): Directory to search recursively.
+        pattern (str): Glob pattern for file names.
+
+    Returns:
+        list: Sorted file paths.
+    """
+    return sorted(glob.glob(os.path.join(directory, "**", pattern), recursive=True))
+
+
+def ingest_directory(directory, chunk_size=300, overlap=50, pattern="*.txt", stats=None):
+    """
+    Stream the chunks of every text file in a directory.
+
+    Files are processed one at a time, so memory stays bounded by one read
+    buffer plus one chunk no matter how large the corpus is.
+
+    Args:
+        directory (str): Corpus directory.
+        chunk_size (int): Maximum number of words per chunk.
+        overlap (int): Number of overlapping words between chunks.
+        pattern (str): Glob pattern for file names.
+        stats (IngestStats, optional): Counters updated while ingesting.
+
+    Yields:
+        tuple: (file_path, chunk) pairs.
+    """
+    for file_path in list_documents(directory, pattern):
+        for chunk in iter_document_chunks(file_path, chunk_size, overlap, stats):
+            yield file_path, chunk
+
+
+def hash_file(file_path, buffer_size=READ_BUFFER_SIZE):
+    """
+    Compute the SHA-256 of a file's content, reading it in blocks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(buffer_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_chunk(chunk):
+    """
+    Content hash of a chunk, used as its id in the search indexes.
+    """
+    return hashlib.blake2b(chunk.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class Manifest:
+    """
+    Record of what has been indexed: for each file its size, mtime, content
+    hash and the hashes of its chunks.
+    """
+
+    def __init__(self, chunk_size=300, overlap=50):
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.files = {}
+
+    @classmethod
+    def load(cls, path, chunk_size=300, overlap=50):
+        """
+        Load a manifest, or start an empty one if the file is missing or was
+        built with different chunking settings (every chunk would differ).
+        """
+        manifest = cls(chunk_size, overlap)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("chunk_size") == chunk_size and data.get("overlap") == overlap:
+                manifest.files = data["files"]
+        return manifest
+
+    def save(self, path):
+        data = {"chunk_size": self.chunk_size, "overlap": self.overlap, "files": self.files}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+
+class SyncReport:
+    """
+    Outcome of sync_corpus(): which files changed and which chunks must be
+    added to or removed from the indexes.
+    """
+
+    def __init__(self):
+        self.added_files = []
+        self.changed_files = []
+        self.removed_files = []
+        self.unchanged_files = 0
+        self.added_chunks = {}
+        self.removed_chunks = set()
+
+    @property
+    def has_changes(self):
+        return bool(self.added_chunks or self.removed_chunks
+                    or self.added_files or self.changed_files or self.removed_files)
+
+    def __str__(self):
+        return (
+            f"{len(self.added_files)} added, {len(self.changed_files)} changed, "
+            f"{len(self.removed_files)} removed, {self.unchanged_files} unchanged file(s); "
+            f"+{len(self.added_chunks)}/-{len(self.removed_chunks)} chunks"
+        )
+
+
+def sync_corpus(paths, manifest, stats=None, verify=False):
+    """
+    Work out what changed in a corpus since the manifest was written.
+
+    Files whose size and mtime match the manifest are skipped without being
+    read. Otherwise the file is hashed, and only re-chunked if its content
+    hash differs. Chunks are identified by content hash, so an edit to one
+    part of a file only adds/removes the chunks that actually changed. A
+    chunk is removed only when no remaining file contains it.
+
+    The manifest is updated in place; save it once the indexes have been
+    updated with the report's added_chunks/removed_chunks.
+
+    Args:
+        paths (list): Files currently in the corpus.
+        manifest (Manifest): Manifest from the previous run.
+        stats (IngestStats, optional): Counters for re-chunked files.
+        verify (bool): Hash every file even if its size and mtime match.
+
+    Returns:
+        SyncReport: Files and chunks that changed.
+    """
+    report = SyncReport()
+    refcounts = Counter(h for entry in manifest.files.values() for h in entry["chunks"])
+    indexed = set(refcounts)
+
+    current = set(paths)
+    for path in [p for p in manifest.files if p not in current]:
+        refcounts.subtract(manifest.files.pop(path)["chunks"])
+        report.removed_files.append(path)
+
+    for path in paths:
+        st = os.stat(path)
+        entry = manifest.files.get(path)
+        if (entry and not verify and entry["size"] == st.st_size
+                and entry["mtime_ns"] == st.st_mtime_ns):
+            report.unchanged_files += 1
+            continue
+
+        digest = hash_file(path)
+        if entry and entry["sha256"] == digest:
+            entry["size"], entry["mtime_ns"] = st.st_size, st.st_mtime_ns
+            report.unchanged_files += 1
+            continue
+
+        chunk_hashes = []
+        for chunk in iter_document_chunks(path, manifest.chunk_size, manifest.overlap, stats):
+            chunk_hash = hash_chunk(chunk)
+            chunk_hashes.append(chunk_hash)
+            if chunk_hash not in indexed:
+                report.added_chunks[chunk_hash] = chunk
+        refcounts.update(chunk_hashes)
+        if entry:
+            refcounts.subtract(entry["chunks"])
+            report.changed_files.append(path)
+        else:
+            report.added_files.append(path)
+        manifest.files[path] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": digest,
+            "chunks": chunk_hashes,
+        }
+
+    report.removed_chunks = {h for h in indexed if refcounts[h] <= 0}
+    return report
+
+
+if __name__ == "__main__":
+    corpus = sys.argv[1] if len(sys.argv) > 1 else "."
+    stats = IngestStats()
+    for _ in ingest_directory(corpus, stats=stats):
+        pass
+    print(stats.report())
@@ -1,10 +1,23 @@
-from groq import Groq
 import os
+import sys
 from dotenv import load_dotenv
+from retriever import InvertedIndex, HybridRetriever
+from ingest import Manifest, list_documents, sync_corpus
+from context import build_context
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from llm_common.clients import get_client, prewarm
+from llm_common.prompts import PromptTemplate, format_prompt_stats
+from llm_common.streaming import print_token, stream_completion
 
 # Load environment variables from .env file
 load_dotenv()
 
+ANSWER_MODEL = "llama-3.3-70b-versatile"
+# Parsed once; counts the prompt tokens of every question.
+ANSWER_PROMPT = PromptTemplate("study.answer", "Context:\n{context}\n\nQuestion:{question}\n\nAnswer:")
+
+
 def load_document(file_path):
     """
     Load text from a file and return its content.
@@ -68,17 +81,26 @@ def score_chunk(chunk, keywords):
     return len(chunk_words & keywords)
 
 
-def get_best_chunk(chunks, question):
+def get_best_chunk(chunks, question, index=None):
     """
     Select the chunk that best matches the question.
 
     Args:
         chunks (list): List of text chunks.
         question (str): User's input question.
+        index (optional): Prebuilt retriever over the chunks, as returned by
+            build_retriever() (keyword, dense or hybrid). When given, it
+            ranks the chunks instead of a linear keyword scan.
 
     Returns:
-        str: The chunk with the highest keyword overlap.
+        str: The chunk with the highest keyword overlap (or retriever score).
     """
+    if index is not None:
+        best = index.top_chunks(question, top_k=1)
+        if best:
+            return best[0]
+        return chunks[0] if chunks else ""
+
     # TODO: Break question into lowercase keywords
     # TODO: Score each chunk using score_chunk
 
@@ -94,12 +116,168 @@ def get_best_chunk(chunks, question):
     return best_chunk
 
 
+def get_context(index, question, top_k=5, token_budget=1200, overlap=50):
+    """
+    Build the prompt context from the top-k chunks instead of a single one.
+
+    Neighbouring chunks are merged, duplicates removed and the result is
+    packed into a token budget, so the prompt carries more relevant text
+    without growing chunk_size.
+
+    Args:
+        index: Retriever returned by build_retriever().
+        question (str): User's input question.
+        top_k (int): Number of ranked chunks to consider.
+        token_budget (int): Maximum estimated tokens of the context.
+        overlap (int): Overlap used when chunking.
+
+    Returns:
+        str: Context for build_prompt().
+    """
+    # Chunk ids go along so duplicates are dropped by id, not by text.
+    chunks = [(chunk_id, index.chunks[chunk_id]) for chunk_id, _ in index.search(question, top_k)]
+    if not chunks and index.chunks:
+        chunks = [next(iter(index.chunks.items()))]
+    return build_context(chunks, token_budget, overlap)
+
+
+def list_corpus(source):
+    """
+    List the files of a corpus: a single text file or a directory of them.
+
+    Args:
+        source (str): Path to a text file or a directory.
+
+    Returns:
+        list: File paths (empty if the source does not exist).
+    """
+    if os.path.isdir(source):
+        return list_documents(source)
+    if os.path.exists(source):
+        return [source]
+    print(f"Error: File '{source}' not found")
+    return []
+
+
+def load_or_build_index(paths, index_dir, chunk_size=300, overlap=50):
+    """
+    Reopen the saved keyword index and bring it up to date with the corpus.
+
+    A manifest of file and chunk hashes is kept next to the index, so only
+    files whose content changed are re-chunked, deleted files are dropped
+    and everything else is left untouched. On an unchanged corpus this only
+    stats the files and loads the index.
+
+    Args:
+        paths (list): Files in the corpus.
+        index_dir (str): Directory holding the manifest and saved index.
+        chunk_size (int): Maximum number of words per chunk.
+        overlap (int): Number of overlapping words between chunks.
+
+    Returns:
+        InvertedIndex: Index over the corpus chunks, keyed by chunk hash.
+    """
+    manifest_path = os.path.join(index_dir, "manifest.json")
+    index_path = os.path.join(index_dir, "keyword.json")
+
+    manifest = Manifest.load(manifest_path, chunk_size, overlap)
+    if manifest.files and os.path.exists(index_path):
+        index = InvertedIndex.load(index_path)
+    else:
+        manifest.files = {}
+        index = InvertedIndex()
+
+    report = sync_corpus(paths, manifest)
+    if report.has_changes:
+        print(f"Updating index: {report}")
+        index.update(report.added_chunks, report.removed_chunks)
+        os.makedirs(index_dir, exist_ok=True)
+        # Save the index before the manifest: if we stop in between, the
+        # next run simply re-applies the same changes.
+        index.save(index_path)
+        manifest.save(manifest_path)
+    return index
+
+
+def load_or_build_dense_index(keyword_index, dense_dir, lsh=False):
+    """
+    Reopen the saved dense index and sync it with the keyword index.
+
+    Only chunks missing from the dense index are embedded, and rows of
+    chunks no longer in the keyword index are dropped. A saved index that
+    cannot be read back (e.g. one written by an older version, or with its
+    vector file deleted) is rebuilt.
+
+    Args:
+        keyword_index (InvertedIndex): Up-to-date keyword index.
+        dense_dir (str): Directory holding the saved dense index.
+        lsh (bool): Search through an approximate LSH index (for large
+            corpora) instead of scoring every row.
+
+    Returns:
+        DenseIndex: Dense index with the same chunk ids as keyword_index.
+    """
+    # numpy is only needed for the dense and hybrid modes.
+    from dense_index import DenseIndex
+
+    dense = DenseIndex()
+    if os.path.exists(os.path.join(dense_dir, "meta.json")):
+        try:
+            dense = DenseIndex.load(dense_dir)
+        except (ValueError, OSError) as e:
+            print(f"Rebuilding dense index: {e}")
+
+    wanted = keyword_index.chunks
+    removed = [chunk_id for chunk_id in dense.chunk_ids if chunk_id not in wanted]
+    added = {chunk_id: text for chunk_id, text in wanted.items() if chunk_id not in dense.chunks}
+    changed = bool(added or removed)
+    if changed:
+        dense.update(added, removed)
+    if lsh and dense.lsh is None and len(dense):
+        dense.build_lsh()
+        changed = True
+    elif not lsh and dense.lsh is not None:
+        dense.lsh = None
+        changed = True
+    if changed:
+        dense.save(dense_dir)
+    return dense
+
+
+def build_retriever(source, mode="keyword", index_dir=None, lsh=False):
+    """
+    Load the retriever used by get_best_chunk().
+
+    Args:
+        source (str): A text file or a directory of .txt files.
+        mode (str): "keyword" (BM25), "dense" (embedding similarity) or
+            "hybrid" (both, fused by rank).
+        index_dir (str, optional): Where the indexes are kept. Defaults to
+            "<source>.index" next to the source.
+        lsh (bool): Use approximate LSH search in the dense index.
+
+    Returns:
+        Retriever with search(), top_chunks() and a chunks dict.
+    """
+    if index_dir is None:
+        index_dir = os.path.splitext(source.rstrip(os.sep))[0] + ".index"
+    keyword_index = load_or_build_index(list_corpus(source), index_dir)
+    if mode == "keyword":
+        return keyword_index
+    dense = load_or_build_dense_index(keyword_index, os.path.join(index_dir, "dense"), lsh)
+    if mode == "dense":
+        return dense
+    if mode == "hybrid":
+        return HybridRetriever(keyword_index, dense)
+    raise ValueError(f"Unknown retrieval mode: {mode}")
+
+
 def build_prompt(context, question):
     """
     Format the prompt with context and the question.
 
     Args:
-        context (str): Best-matching text chunk.
+        context (str): Best-matching text chunk(s).
         question (str): User's input question.
 
     Returns:
@@ -111,7 +289,7 @@ def build_prompt(context, question):
     #
     # Question: {question}
     # Answer:
-    prompt = f"Context:\n{context}\n\nQuestion:{question}\n\nAnswer:"
+    prompt = ANSWER_PROMPT.render(context=context, question=question)
     # TODO: Return formatted string
     return prompt
 
@@ -134,33 +312,69 @@ def get_answer_from_groq(prompt, api_key):
     #   - messages=[{"role": "user", "content": prompt}]
     #   - temperature=0.3
     #   - max_completion_tokens=512
-    client = Groq(api_key=api_key)
+    # Shared client: pooled connections, rate-limit retries and the
+    # response cache for identical prompts
+    client = get_client("groq", api_key)
     completion = client.chat.completions.create(
-      model="llama-3.3-70b-versatile",
+      model=ANSWER_MODEL,
       messages=[{"role": "user", "content": prompt}],
       temperature=0.3,
       max_completion_tokens=512
     )
+    ANSWER_PROMPT.record_usage(completion)
     # TODO: Return the model's response text
     final_reply = completion.choices[0].message.content.strip()
     return final_reply
 
 
+def stream_answer_from_groq(prompt, api_key, on_token=print_token):
+    """
+    Stream the model's answer, handing each token to on_token as it arrives.
+
+    The first words appear after the time-to-first-token instead of after
+    the whole answer has been generated.
+
+    Args:
+        prompt (str): The input prompt containing context + question.
+        api_key (str): Groq API key provided by the user.
+        on_token (callable): Called with each piece of text; prints it by
+            default.
+
+    Returns:
+        tuple: (full answer text, StreamStats with time to first token and
+        tokens/second).
+    """
+    client = get_client("groq", api_key)
+    answer, stats = stream_completion(
+        client,
+        on_token=on_token,
+        model=ANSWER_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.3,
+        max_completion_tokens=512,
+    )
+    return answer.strip(), stats
+
+
 if __name__ == "__main__":
-    print("Loading document...")
-    doc_content = load_document("document.txt")
+    # Import the Groq SDK while the index loads and the user types
+    prewarm("groq")
 
-    print("Splitting into chunks...")
-    chunks = chunk_text(doc_content)
+    print("Loading index...")
+    source = os.getenv("STUDY_DOCUMENTS", "document.txt")
+    index = build_retriever(source, os.getenv("RETRIEVAL_MODE", "keyword"),
+                            lsh=os.getenv("DENSE_LSH", "0") != "0")
 
     # Ask user question
     question = input("Enter your question: ").lower()
 
-    # Find best chunk
-    best_chunk = get_best_chunk(chunks, question)
+    # Gather the best chunks into a token-budgeted context
+    context = get_context(index, question, top_k=5,
+                          token_budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "1200")))
 
     # Build prompt
-    prompt = build_prompt(best_chunk, question)
+    prompt = build_prompt(context, question)
+    print(format_prompt_stats())
 
     # Get API key from environment variables
     api_key = os.getenv('GROQ_API_KEY')
@@ -169,11 +383,16 @@ if __name__ == "__main__":
         print("Please set your API key in the .env file.")
         exit(1)
 
-    # Call Groq API
+    # Call Groq API, streaming the answer unless LLM_STREAM=0
     try:
-        answer = get_answer_from_groq(prompt, api_key)
-        print("\nAnswer:")
-        print(answer.strip())
+        if os.getenv("LLM_STREAM", "1") != "0":
+            print("\nAnswer:")
+            answer, stats = stream_answer_from_groq(prompt, api_key)
+            print(f"\n\n[{stats.report()}]")
+        else:
+            answer = get_answer_from_groq(prompt, api_key)
+            print("\nAnswer:")
+            print(answer.strip())
     except Exception as e:
         print(f"Error generating answer: {e}")
         print("Please check your API key and internet connection.")
\ No newline at end of file
@@ -0,0 +1,294 @@
+import heapq
+import json
+import math
+import os
+import re
+
+TOKEN_PATTERN = re.compile(r"\w+")
+INDEX_FORMAT_VERSION = 1
+# Function words found in most chunks; they add almost nothing to a BM25
+# score but their postings cover the whole corpus.
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been but by can could did do does for from had has have he her
+his how i if in into is it its me my no not of on or our she so than that the their them then there these they
+this those to was we were what when where which who whom why will with would you your
+""".split())
+
+
+def tokenize(text):
+    """
+    Split text into lowercase word tokens, dropping punctuation.
+
+    Args:
+        text (str): Input text.
+
+    Returns:
+        list: List of lowercase tokens.
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class InvertedIndex:
+    """
+    Inverted index over text chunks with BM25 ranking.
+
+    Each term maps to a postings dict of {chunk_id: term_frequency}, so a
+    query only touches the postings of its own terms instead of scanning
+    every chunk.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        """
+        Args:
+            k1 (float): BM25 term-frequency saturation parameter.
+            b (float): BM25 document-length normalization parameter.
+        """
+        self.k1 = k1
+        self.b = b
+        self.postings = {}
+        self.doc_lengths = {}
+        self.chunks = {}
+        self.total_length = 0
+
+    @classmethod
+    def from_chunks(cls, chunks, **kwargs):
+        """
+        Build an index from the output of chunk_text().
+
+        Args:
+            chunks (iterable): Text chunks (a list or a streaming
+                generator). Chunk ids are their positions.
+
+        Returns:
+            InvertedIndex: The populated index.
+        """
+        index = cls(**kwargs)
+        for position, chunk in enumerate(chunks):
+            index.add(str(position), chunk)
+        return index
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def add(self, chunk_id, text):
+        """
+        Add a chunk to the index.
+
+        Args:
+            chunk_id (str): Unique id of the chunk.
+            text (str): Chunk text.
+        """
+        if chunk_id in self.chunks:
+            self.remove(chunk_id)
+        tokens = tokenize(text)
+        term_counts = {}
+        for token in tokens:
+            term_counts[token] = term_counts.get(token, 0) + 1
+        for term, count in term_counts.items():
+            self.postings.setdefault(term, {})[chunk_id] = count
+        self.doc_lengths[chunk_id] = len(tokens)
+        self.chunks[chunk_id] = text
+        self.total_length += len(tokens)
+
+    def remove(self, chunk_id):
+        """
+        Remove a chunk from the index. Unknown ids are ignored.
+
+        Args:
+            chunk_id (str): Id of the chunk to remove.
+        """
+        text = self.chunks.pop(chunk_id, None)
+        if text is None:
+            return
+        for term in set(tokenize(text)):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(chunk_id, None)
+                if not postings:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(chunk_id)
+
+    def update(self, added, removed):
+        """
+        Apply an incremental change set.
+
+        Args:
+            added (dict): {chunk_id: text} of chunks to add.
+            removed (iterable): Ids of chunks to remove.
+        """
+        for chunk_id in removed:
+            self.remove(chunk_id)
+        for chunk_id, text in added.items():
+            self.add(chunk_id, text)
+
+    def idf(self, term):
+        """
+        Compute the BM25 inverse document frequency of a term.
+
+        Args:
+            term (str): Lowercase term.
+
+        Returns:
+            float: IDF weight (0.0 for unknown terms).
+        """
+        doc_freq = len(self.postings.get(term, ()))
+        if not doc_freq:
+            return 0.0
+        n_docs = len(self.doc_lengths)
+        return math.log(1 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def query_terms(self, query, max_df=None):
+        """
+        Pick the query terms worth scoring.
+
+        By default every indexed query term is kept, which gives exact BM25.
+        With max_df set, stopwords and terms found in more than max_df of
+        the chunks are skipped: their postings span most of the index while
+        their idf is close to zero, so this trades a slightly different
+        ranking for less work. If that leaves nothing, the common
+        non-stopwords are used, then the stopwords, so the query still gets
+        results.
+
+        Returns:
+            list: Indexed query terms.
+        """
+        terms = [term for term in set(tokenize(query)) if term in self.postings]
+        if max_df is None:
+            return terms
+        content = [term for term in terms if term not in STOPWORDS]
+        limit = max_df * len(self.doc_lengths)
+        selective = [term for term in content if len(self.postings[term]) <= limit]
+        return selective or content or terms
+
+    def search(self, query, top_k=5, max_df=None):
+        """
+        Rank chunks against a query with BM25.
+
+        By default the ranking is exact. Pass max_df to walk only the
+        postings of selective terms (see query_terms), so the work depends
+        on how rare the query's words are, not on the number of chunks.
+
+        Args:
+            query (str): User's question.
+            top_k (int): Maximum number of results to return.
+            max_df (float, optional): Skip stopwords and terms found in
+                more than this share of chunks (1.0 skips stopwords only).
+                None scores every term.
+
+        Returns:
+            list: (chunk_id, score) tuples, best first. Chunks sharing no
+            scored term with the query are not returned.
+        """
+        if not self.doc_lengths:
+            return []
+        avg_length = self.total_length / len(self.doc_lengths) or 1.0
+        k1, b = self.k1, self.b
+        scores = {}
+        for term in self.query_terms(query, max_df):
+            postings = self.postings[term]
+            idf = self.idf(term)
+            for chunk_id, tf in postings.items():
+                norm = k1 * (1 - b + b * self.doc_lengths[chunk_id] / avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    def top_chunks(self, query, top_k=5):
+        """
+        Return the text of the best-matching chunks for a query.
+
+        Args:
+            query (str): User's question.
+            top_k (int): Maximum number of chunks to return.
+
+        Returns:
+            list: Chunk texts, best first.
+        """
+        return [self.chunks[chunk_id] for chunk_id, _ in self.search(query, top_k)]
+
+    def save(self, path):
+        """
+        Write the index to disk as JSON.
+
+        The file is written to a temporary path first and then moved into
+        place, so a crash never leaves a half-written index behind.
+
+        Args:
+            path (str): Destination file path.
+        """
+        data = {
+            "version": INDEX_FORMAT_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "postings": self.postings,
+            "doc_lengths": self.doc_lengths,
+            "chunks": self.chunks,
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reopen an index previously written with save().
+
+        Args:
+            path (str): Path of the saved index.
+
+        Returns:
+            InvertedIndex: The restored index.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format in '{path}'")
+        index = cls(k1=data["k1"], b=data["b"])
+        index.postings = data["postings"]
+        index.doc_lengths = data["doc_lengths"]
+        index.chunks = data["chunks"]
+        index.total_length = sum(index.doc_lengths.values())
+        return index
+
+
+class HybridRetriever:
+    """
+    Combine a keyword index and a dense index with reciprocal rank fusion.
+
+    Fusing ranks rather than raw scores avoids having to calibrate BM25
+    scores against cosine similarities.
+    """
+
+    def __init__(self, keyword_index, dense_index, candidates=50, rrf_k=60):
+        """
+        Args:
+            keyword_index (InvertedIndex): BM25 index over the chunks.
+            dense_index (DenseIndex): Dense index over the same chunk ids.
+            candidates (int): Results taken from each index before fusing.
+            rrf_k (int): Rank fusion constant; larger values flatten ranks.
+        """
+        self.keyword_index = keyword_index
+        self.dense_index = dense_index
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+
+    @property
+    def chunks(self):
+        return self.keyword_index.chunks
+
+    def __len__(self):
+        return len(self.keyword_index)
+
+    def search(self, query, top_k=5):
+        """
+        Returns:
+            list: (chunk_id, fused_score) tuples, best first.
+        """
+        scores = {}
+        for index in (self.keyword_index, self.dense_index):
+            for rank, (chunk_id, _) in enumerate(index.search(query, self.candidates)):
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    def top_chunks(self, query, top_k=5):
+        return [self.chunks[chunk_id] for chunk_id, _ in self.search(query, top_k)]